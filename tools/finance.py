@@ -5,29 +5,66 @@ Simplified Excel and CSV budget tracking
 
 Usage:
     python finance.py              # Run full analysis (auto-detects Excel/CSV in data/inputs/)
+    python finance.py --summary-only   # Summary cards and category totals only (low memory)
+    python finance.py --export     # Also write financial_report.xlsx for the accountants
+
+    python finance.py ingest       # Parse data/inputs/ into the cache (data/cache/), no report
+    python finance.py report       # Build the report from the cache
+    python finance.py totals --month 2025-01 --category Auto [--json]
+    python finance.py stats [--json]   # What the cache holds and whether it is current
+    python finance.py verify       # Check the cache against the inputs and its own rows
 
 Configuration:
     - Edit tools/config.json to define your budget categories
     - Drop Excel (.xlsx, .xls) or CSV file in data/inputs/
     - Run the program to generate financial_report.html
+    - Optional "settings" in config.json tune it for very large inputs
+      (max_rows_in_memory > 0 spills sorted rows to disk instead of RAM,
+       detail_months > 0 rolls older months into data/history_summary.json)
 """
 
+import argparse
+import contextlib
+import difflib
+import filecmp
+import fnmatch
+import hashlib
+import html
+import importlib.util
+import io
 import json
+import math
+import re
 import sys
 import os
-import csv
+import gzip
+import heapq
+import pickle
+import shutil
+import tempfile
+import time
+import weakref
+import zipfile
+from array import array
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
-
-try:
-    import openpyxl
-    EXCEL_SUPPORT = True
-except ImportError:
-    EXCEL_SUPPORT = False
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+# openpyxl (and numpy, which it and finance_reconcile load) take a good part of a
+# second to import, so they are only imported once a workbook is opened or a report
+# built. The cache queries (finance.py totals/stats) never need them.
+EXCEL_SUPPORT = importlib.util.find_spec('openpyxl') is not None
+if not EXCEL_SUPPORT:
     print("❌ Excel support not available. Install: pip install openpyxl")
     sys.exit(1)
 
+from finance_analysis import BudgetAnalyzer, analyze, budget_variance
+from finance_charts import balance_chart, category_chart
+from finance_csv import CsvFile, parse_amount
+from finance_search import SEARCH_BOX_HTML, SEARCH_SCRIPT, SearchIndexBuilder
+
 # Directories
 if getattr(sys, 'frozen', False):
     BASE_DIR = Path(sys.executable).parent
@@ -44,378 +81,33 @@ REPORT_FILE = BASE_DIR / "financial_report.html"
 DATA_DIR.mkdir(exist_ok=True)
 INPUTS_DIR.mkdir(exist_ok=True)
 
-
-class BudgetManager:
-    def __init__(self):
-        self.config = self.load_config()
-        self.monthly_data = {}  # {month: {date: row_data}}
-
-    def load_config(self):
-        """Load configuration from config.json"""
-        if not CONFIG_FILE.exists():
-            print(f"❌ Config file not found: {CONFIG_FILE}")
-            print("   Create config.json using budget_editor.html")
-            sys.exit(1)
-
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-
-        # Validate config structure
-        required_keys = ['expenses', 'savings_goals', 'accounts']
-        for key in required_keys:
-            if key not in config:
-                print(f"❌ Config missing required key: {key}")
-                sys.exit(1)
-
-        return config
-
-    def find_input_files(self):
-        """Find Excel and CSV files in data/inputs/"""
-        input_files = (
-            list(INPUTS_DIR.glob('*.xlsx')) +
-            list(INPUTS_DIR.glob('*.xls')) +
-            list(INPUTS_DIR.glob('*.csv'))
-        )
-        input_files = [f for f in input_files if not f.name.startswith('~')]  # Ignore temp files
-        return input_files
-
-    def parse_date(self, date_value):
-        """Parse date from Excel (handles MM/DD/YYYY and datetime objects)"""
-        if isinstance(date_value, datetime):
-            return date_value
-
-        if isinstance(date_value, str):
-            # Try MM/DD/YYYY format
-            try:
-                return datetime.strptime(date_value, '%m/%d/%Y')
-            except:
-                pass
-            # Try other common formats
-            for fmt in ['%Y-%m-%d', '%m-%d-%Y', '%d/%m/%Y']:
-                try:
-                    return datetime.strptime(date_value, fmt)
-                except:
-                    continue
-
-        return None
-
-    def process_excel_file(self, excel_file):
-        """Process Excel file based on config.json structure"""
-        print(f"\n📊 Processing: {excel_file.name}")
-
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-
-        # Read header row to map columns
-        header_row = list(ws.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-
-        # Find column indices by matching headers
-        date_col = 0  # Column A (should be "Date")
-        desc_col = 1  # Column B (should be description)
-
-        # Build mappings by matching Excel headers to config categories
-        expense_cols = {}
-        savings_cols = {}
-        account_cols = {}
-
-        print(f"   Matching Excel headers to config categories...")
-
-        for col_idx, header in enumerate(header_row):
-            if not header or col_idx < 2:  # Skip Date and Description columns
-                continue
-
-            header_str = str(header).strip()
-
-            # Try to match to expense categories
-            if header_str in self.config['expenses']:
-                expense_cols[header_str] = col_idx
-                print(f"      Found expense: {header_str} in column {chr(65 + col_idx)}")
-
-            # Try to match to savings goals
-            elif header_str in self.config['savings_goals']:
-                savings_cols[header_str] = col_idx
-                print(f"      Found savings goal: {header_str} in column {chr(65 + col_idx)}")
-
-            # Try to match to account tracking
-            elif header_str in self.config['accounts']:
-                account_cols[header_str] = col_idx
-                print(f"      Found account: {header_str} in column {chr(65 + col_idx)}")
-
-            # Warn about unmatched columns
-            else:
-                if header_str not in ['Deposit', 'Balance', '']:  # Ignore common extra columns
-                    print(f"      ⚠️  Column '{header_str}' in Excel not in config (will be ignored)")
-
-        # Verify we found all configured categories
-        missing_expenses = set(self.config['expenses'].keys()) - set(expense_cols.keys())
-        missing_savings = set(self.config['savings_goals'].keys()) - set(savings_cols.keys())
-        missing_accounts = set(self.config['accounts'].keys()) - set(account_cols.keys())
-
-        if missing_expenses:
-            print(f"      ⚠️  Config expenses not in Excel: {', '.join(missing_expenses)}")
-        if missing_savings:
-            print(f"      ⚠️  Config savings goals not in Excel: {', '.join(missing_savings)}")
-        if missing_accounts:
-            print(f"      ⚠️  Config accounts not in Excel: {', '.join(missing_accounts)}")
-
-        print(f"   ✅ Mapped {len(expense_cols)} expenses, {len(savings_cols)} savings, {len(account_cols)} accounts")
-
-        # Process data rows
-        row_count = 0
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            # Check for Totals row
-            if row[0] and str(row[0]).strip().lower() == 'totals':
-                print(f"   Found Totals row, stopping")
-                break
-
-            # Skip empty rows
-            if not row[0]:
-                continue
-
-            # Parse date
-            trans_date = self.parse_date(row[date_col])
-            if not trans_date:
-                continue
-
-            # Get description
-            description = str(row[desc_col]) if len(row) > desc_col and row[desc_col] else ""
-
-            # Extract all values
-            row_data = {
-                'date': trans_date,
-                'description': description,
-                'expenses': {},
-                'savings_goals': {},
-                'accounts': {}
-            }
-
-            # Extract expenses
-            for category, col_idx in expense_cols.items():
-                if col_idx < len(row) and row[col_idx]:
-                    try:
-                        value = float(row[col_idx])
-                        row_data['expenses'][category] = value
-                    except:
-                        pass
-
-            # Extract savings goals
-            for category, col_idx in savings_cols.items():
-                if col_idx < len(row) and row[col_idx]:
-                    try:
-                        value = float(row[col_idx])
-                        row_data['savings_goals'][category] = value
-                    except:
-                        pass
-
-            # Extract account tracking
-            for category, col_idx in account_cols.items():
-                if col_idx < len(row) and row[col_idx]:
-                    try:
-                        value = float(row[col_idx])
-                        row_data['accounts'][category] = value
-                    except:
-                        pass
-
-            # Group by month
-            month_key = trans_date.strftime('%Y-%m')
-            if month_key not in self.monthly_data:
-                self.monthly_data[month_key] = []
-
-            self.monthly_data[month_key].append(row_data)
-            row_count += 1
-
-        print(f"   ✅ Processed {row_count} rows across {len(self.monthly_data)} months")
-        return True
-
-    def process_csv_file(self, csv_file):
-        """Process CSV file based on config.json structure"""
-        print(f"\n📊 Processing: {csv_file.name}")
-
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            # Read header row
-            csv_reader = csv.reader(f)
-            header_row = next(csv_reader)
-
-            # Find column indices by matching headers
-            date_col = 0  # Column A (should be "Date")
-            desc_col = 1  # Column B (should be description)
-
-            # Build mappings by matching CSV headers to config categories
-            expense_cols = {}
-            savings_cols = {}
-            account_cols = {}
-
-            print(f"   Matching CSV headers to config categories...")
-
-            for col_idx, header in enumerate(header_row):
-                if not header or col_idx < 2:  # Skip Date and Description columns
-                    continue
-
-                header_str = str(header).strip()
-
-                # Try to match to expense categories
-                if header_str in self.config['expenses']:
-                    expense_cols[header_str] = col_idx
-                    print(f"      Found expense: {header_str} in column {col_idx}")
-
-                # Try to match to savings goals
-                elif header_str in self.config['savings_goals']:
-                    savings_cols[header_str] = col_idx
-                    print(f"      Found savings goal: {header_str} in column {col_idx}")
-
-                # Try to match to account tracking
-                elif header_str in self.config['accounts']:
-                    account_cols[header_str] = col_idx
-                    print(f"      Found account: {header_str} in column {col_idx}")
-
-                # Warn about unmatched columns
-                else:
-                    if header_str not in ['Deposit', 'Balance', '']:
-                        print(f"      ⚠️  Column '{header_str}' in CSV not in config (will be ignored)")
-
-            # Verify we found all configured categories
-            missing_expenses = set(self.config['expenses'].keys()) - set(expense_cols.keys())
-            missing_savings = set(self.config['savings_goals'].keys()) - set(savings_cols.keys())
-            missing_accounts = set(self.config['accounts'].keys()) - set(account_cols.keys())
-
-            if missing_expenses:
-                print(f"      ⚠️  Config expenses not in CSV: {', '.join(missing_expenses)}")
-            if missing_savings:
-                print(f"      ⚠️  Config savings goals not in CSV: {', '.join(missing_savings)}")
-            if missing_accounts:
-                print(f"      ⚠️  Config accounts not in CSV: {', '.join(missing_accounts)}")
-
-            print(f"   ✅ Mapped {len(expense_cols)} expenses, {len(savings_cols)} savings, {len(account_cols)} accounts")
-
-            # Process data rows
-            row_count = 0
-            for row in csv_reader:
-                # Check for Totals row
-                if row[0] and str(row[0]).strip().lower() == 'totals':
-                    print(f"   Found Totals row, stopping")
-                    break
-
-                # Skip empty rows
-                if not row[0]:
-                    continue
-
-                # Parse date
-                trans_date = self.parse_date(row[date_col])
-                if not trans_date:
-                    continue
-
-                # Get description
-                description = str(row[desc_col]) if len(row) > desc_col and row[desc_col] else ""
-
-                # Extract all values
-                row_data = {
-                    'date': trans_date,
-                    'description': description,
-                    'expenses': {},
-                    'savings_goals': {},
-                    'accounts': {}
-                }
-
-                # Extract expenses
-                for category, col_idx in expense_cols.items():
-                    if col_idx < len(row) and row[col_idx]:
-                        try:
-                            value = float(row[col_idx])
-                            row_data['expenses'][category] = value
-                        except:
-                            pass
-
-                # Extract savings goals
-                for category, col_idx in savings_cols.items():
-                    if col_idx < len(row) and row[col_idx]:
-                        try:
-                            value = float(row[col_idx])
-                            row_data['savings_goals'][category] = value
-                        except:
-                            pass
-
-                # Extract account tracking
-                for category, col_idx in account_cols.items():
-                    if col_idx < len(row) and row[col_idx]:
-                        try:
-                            value = float(row[col_idx])
-                            row_data['accounts'][category] = value
-                        except:
-                            pass
-
-                # Group by month
-                month_key = trans_date.strftime('%Y-%m')
-                if month_key not in self.monthly_data:
-                    self.monthly_data[month_key] = []
-
-                self.monthly_data[month_key].append(row_data)
-                row_count += 1
-
-            print(f"   ✅ Processed {row_count} rows across {len(self.monthly_data)} months")
-            return True
-
-    def calculate_monthly_totals(self):
-        """Calculate totals for each month"""
-        monthly_totals = {}
-
-        for month, rows in self.monthly_data.items():
-            totals = {
-                'expenses': defaultdict(float),
-                'savings_goals': defaultdict(float),
-                'accounts': defaultdict(float),
-                'total_expenses': 0,
-                'total_savings': 0,
-                'total_deposits': 0,
-                'start_balance': 0,
-                'end_balance': 0
-            }
-
-            # Sum up all categories
-            for row in rows:
-                # Expenses
-                for cat, val in row['expenses'].items():
-                    totals['expenses'][cat] += abs(val)
-                    totals['total_expenses'] += abs(val)
-
-                # Savings goals
-                for cat, val in row['savings_goals'].items():
-                    totals['savings_goals'][cat] += abs(val)
-                    totals['total_savings'] += abs(val)
-
-                # Track balance (last value in month)
-                if 'Balance' in row['accounts']:
-                    totals['end_balance'] = row['accounts']['Balance']
-
-                # Track deposits
-                if 'Deposits' in row['accounts']:
-                    totals['total_deposits'] += abs(row['accounts']['Deposits'])
-
-            # Set start balance (first row's balance or previous month's end)
-            if rows and 'Balance' in rows[0]['accounts']:
-                totals['start_balance'] = rows[0]['accounts']['Balance']
-
-            monthly_totals[month] = totals
-
-        return monthly_totals
-
-    def generate_html_report(self):
-        """Generate beautiful HTML report"""
-        print("\n📄 Generating HTML report...")
-
-        monthly_totals = self.calculate_monthly_totals()
-
-        # Sort months
-        sorted_months = sorted(self.monthly_data.keys(), reverse=True)
-
-        # Generate HTML - continuing in next message due to length
-        html_start = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Mom's Budget Report</title>
-    <style>
-        * {
+# Optional tuning knobs, read from the "settings" section of config.json
+DEFAULT_SETTINGS = {
+    'max_rows_in_memory': 0,  # 0 = keep every row in memory, otherwise spill to disk
+    'spill_dir': None,        # Where spilled runs go (default: system temp folder)
+    'summary_only': False,    # Skip the transaction log and never store rows
+    'compact_report': False,  # Class-based markup + shared budget_report.css (much smaller)
+    'gzip_report': False,     # Also write financial_report.html.gz
+    'excel_sheets': 'active', # "active", "all", or sheet name pattern(s) like "20*"
+    'sheet_workers': 0,       # Processes for multi-sheet workbooks (0 = one per sheet/CPU)
+    'fuzzy_headers': True,    # Match misspelled headers to the closest category
+    'fuzzy_cutoff': 0.85,     # How close (0-1) a misspelled header must be
+    'reconcile_balances': True,   # Check the Balance column against the running balance
+    'reconcile_tolerance': 0.01,  # Differences up to this many dollars are ignored
+    'charts': True,           # Trend charts at the top of the report
+    'chart_points': 300,      # Most points drawn per chart line, however long the history
+    'search_index': 'embedded',  # Report search box: "embedded", "sidecar" (.search.js file) or "off"
+    'highlights': True,       # Over-budget and unusual-month highlights
+    'anomaly_window': 12,     # Months of history a category is compared against
+    'anomaly_threshold': 2.5, # Standard deviations from the average that count as unusual
+    'anomaly_min_months': 6,  # History needed before a category can be flagged
+    'export_excel': False,    # Also write financial_report.xlsx (transactions, totals, per year)
+    'detail_months': 0,       # Months kept in full detail; older ones become summary records (0 = keep all)
+}
+
+
+# Report stylesheet (inlined in each report, or shared as an external file in compact mode)
+REPORT_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
@@ -580,92 +272,2068 @@ class BudgetManager:
             font-size: 1.1em;
             line-height: 1.8;
         }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>💰 BUDGET REPORT</h1>
-            <p>Generated on """ + datetime.now().strftime('%B %d, %Y at %I:%M %p') + """</p>
-        </div>
 
-        <div class="content">
-"""
+        .notice {
+            background: white;
+            padding: 15px 20px;
+            border-radius: 8px;
+            border-left: 3px solid #AB987A;
+            color: #0F1626;
+        }
 
-        html_content = ""
-        
-        if not sorted_months:
-            html_content = """
-            <div class="no-data">
-                <h2>No Data Found</h2>
-                <p>Drop your Excel budget file in <code>data/inputs/</code> folder<br>
-                and run the program again to generate your report.</p>
-            </div>
-"""
-        else:
-            for month in sorted_months:
-                month_name = datetime.strptime(month, '%Y-%m').strftime('%B %Y')
-                totals = monthly_totals[month]
-                rows = self.monthly_data[month]
+        .data-table {
+            width: 100%;
+            border-collapse: collapse;
+            background: white;
+            border-radius: 8px;
+        }
 
-                month_html = f"""
-            <div class="month-section">
-                <div class="month-header">
-                    📅 {month_name}
-                </div>
-                <div class="month-content">
-                    <!-- Summary Cards -->
-                    <div class="summary-cards">
-                        <div class="summary-card">
-                            <div class="label">Total Expenses</div>
-                            <div class="value">${totals['total_expenses']:,.2f}</div>
-                        </div>
-                        <div class="summary-card">
-                            <div class="label">Total Savings</div>
-                            <div class="value">${totals['total_savings']:,.2f}</div>
-                        </div>
-                        <div class="summary-card">
-                            <div class="label">Deposits</div>
-                            <div class="value positive">${totals['total_deposits']:,.2f}</div>
-                        </div>
-                        <div class="summary-card">
-                            <div class="label">End Balance</div>
-                            <div class="value">${totals['end_balance']:,.2f}</div>
-                        </div>
-                    </div>
+        .data-table th {
+            background: #f8f9fa;
+            text-align: left;
+            padding: 10px;
+            border-bottom: 2px solid #e0e0e0;
+        }
 
-                    <!-- Expenses -->
-                    <div class="category-section">
-                        <h3>💳 Monthly Expenses</h3>
-                        <div class="category-grid">
-"""
+        .data-table td {
+            padding: 8px;
+            border-bottom: 1px solid #f0f0f0;
+        }
 
-                for category in self.config['expenses'].keys():
-                    amount = totals['expenses'].get(category, 0)
-                    if amount > 0:
-                        month_html += f"""
-                            <div class="category-item">
-                                <span class="name">{category}</span>
-                                <span class="value">${amount:,.2f}</span>
-                            </div>
-"""
+        .data-table .r {
+            text-align: right;
+        }
 
-                month_html += """
-                        </div>
-                    </div>
+        .chart-box {
+            background: white;
+            padding: 15px 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+        }
 
-                    <!-- Savings Goals -->
-                    <div class="category-section">
-                        <h3>🎯 Savings Goals</h3>
-                        <div class="category-grid">
-"""
+        .chart-box h3 {
+            color: #0F1626;
+            margin-bottom: 10px;
+        }
 
-                for category in self.config['savings_goals'].keys():
-                    amount = totals['savings_goals'].get(category, 0)
-                    if amount > 0:
-                        month_html += f"""
-                            <div class="category-item">
-                                <span class="name">{category}</span>
+        .chart-legend {
+            font-size: 0.85em;
+            color: #666;
+            margin-top: 8px;
+        }
+
+        .search-box {
+            margin-bottom: 40px;
+        }
+
+        .search-box input {
+            width: 100%;
+            padding: 14px 18px;
+            font-size: 1.1em;
+            border: 2px solid #AB987A;
+            border-radius: 8px;
+        }
+
+        #search-status {
+            color: #666;
+            margin: 10px 0;
+        }
+
+        #search-results {
+            display: block;
+            max-height: 400px;
+            overflow-y: auto;
+        }
+
+        #search-results[hidden] {
+            display: none;
+        }
+"""
+
+# Extra rules used by the class-based markup of compact reports
+COMPACT_CSS = """
+.log { background: white; padding: 15px; border-radius: 8px; max-height: 300px; overflow-y: auto; }
+.log table { width: 100%; border-collapse: collapse; }
+.log thead tr { background: #f8f9fa; text-align: left; }
+.log th { padding: 10px; border-bottom: 2px solid #e0e0e0; }
+.log td { padding: 8px; border-bottom: 1px solid #f0f0f0; }
+.log .r { text-align: right; }
+"""
+REPORT_CSS_NAME = "budget_report.css"
+
+# Most balance mismatches listed in the report
+MAX_RECONCILE_ROWS = 200
+
+# Most over-budget / unusual items listed in the report highlights
+MAX_HIGHLIGHTS = 50
+
+# Compacted months: totals only, kept across runs
+HISTORY_FILE_NAME = "history_summary.json"
+
+# Parsed rows and totals, so queries and reports don't re-read data/inputs/
+CACHE_DIR_NAME = "cache"
+CACHE_VERSION = 1
+RAW_BATCH_SIZE = 10000  # Raw rows per pickle record in data/cache/raw/
+
+# Settings that change which rows are read or how they are totalled
+INGEST_SETTINGS = ('excel_sheets', 'fuzzy_headers', 'fuzzy_cutoff', 'summary_only', 'detail_months')
+
+# Settings that only change the report highlights, and settings that change no output at all
+HIGHLIGHT_SETTINGS = ('anomaly_window', 'anomaly_threshold', 'anomaly_min_months')
+RUNTIME_SETTINGS = ('max_rows_in_memory', 'spill_dir', 'sheet_workers', 'export_excel')
+
+# Per-section total in a month's totals
+SECTION_TOTALS = {'expenses': 'total_expenses', 'savings_goals': 'total_savings'}
+
+# Part of the report's content hash; bump when the report layout changes
+REPORT_FORMAT = 2
+# Report sections that depend on budgets are marked so they can be replaced on their own
+SECTION_MARKER_RE = re.compile(r'<!-- section:([a-z-]+) -->')
+GENERATED_RE = re.compile(r'<p>Generated on .*?</p>')
+HASH_META_RE = re.compile(r'<meta name="budget-content-hash" content="([0-9a-f]+)">')
+HASH_XLSX_RE = re.compile(r'<dc:identifier>([0-9a-f]+)</dc:identifier>')
+
+# Temp files are private; finished files get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', only_if_changed=False, **kwargs):
+    """Open a temp file next to path that replaces path only if the block succeeds
+
+    Readers (browsers, sync tools, the report server) never see a half-written file.
+    With only_if_changed, a path already holding the same bytes is left alone
+    (mtime included) and the temp file is dropped.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        if only_if_changed and path.exists() and filecmp.cmp(tmp, path, shallow=False):
+            os.unlink(tmp)
+            return
+        try:
+            permissions = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            permissions = 0o666 & ~_UMASK
+        os.chmod(tmp, permissions)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def write_if_changed(path, data):
+    """Atomically write data (str or bytes) unless path already holds exactly that
+
+    Returns True if the file was written.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    with contextlib.suppress(FileNotFoundError):
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+
+    with atomic_write(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+class MonthStore:
+    """Transaction rows grouped by month, spilled to sorted runs on disk when large
+
+    Rows are buffered in memory until max_rows_in_memory is reached, then each
+    month's buffer is sorted by date and written to a temporary run file.
+    iter_rows() k-way merges a month's runs back together, so only one row
+    per run is ever held in memory while reading.
+    """
+
+    def __init__(self, max_rows_in_memory=0, spill_dir=None):
+        self.max_rows_in_memory = max_rows_in_memory
+        self.spill_dir = spill_dir
+        self._buffers = {}              # {month: [(date, seq, row_data)]}
+        self._runs = defaultdict(list)  # {month: [run file paths]}
+        self._counts = defaultdict(int)
+        self._buffered = 0
+        self._seq = 0
+        self._tmpdir = None
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, month):
+        return month in self._counts
+
+    def months(self):
+        """All months that have at least one row"""
+        return list(self._counts.keys())
+
+    def row_count(self, month=None):
+        """Number of rows stored for one month (or all months)"""
+        if month is None:
+            return sum(self._counts.values())
+        return self._counts.get(month, 0)
+
+    def append(self, month, row_data):
+        """Add one row, spilling to disk if the memory budget is exceeded"""
+        # seq keeps rows with the same date in the order they were read
+        self._buffers.setdefault(month, []).append((row_data['date'], self._seq, row_data))
+        self._seq += 1
+        self._counts[month] += 1
+        self._buffered += 1
+
+        if self.max_rows_in_memory and self._buffered >= self.max_rows_in_memory:
+            self.spill()
+
+    def spill(self):
+        """Write every buffered month to its own sorted run file"""
+        if not self._buffered:
+            return
+
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='budget_spill_', dir=self.spill_dir)
+            print(f"   💾 Memory budget reached, spilling sorted rows to {self._tmpdir}")
+            # Remove the runs when the store goes away
+            weakref.finalize(self, shutil.rmtree, self._tmpdir, ignore_errors=True)
+
+        for month, entries in self._buffers.items():
+            entries.sort()
+            run_file = Path(self._tmpdir) / f"{month}_{len(self._runs[month]):05d}.run"
+            with open(run_file, 'wb') as f:
+                for entry in entries:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._runs[month].append(run_file)
+
+        self._buffers = {}
+        self._buffered = 0
+
+    def discard(self, month):
+        """Drop every row of one month (buffered and spilled)"""
+        for run_file in self._runs.pop(month, []):
+            run_file.unlink(missing_ok=True)
+        self._buffered -= len(self._buffers.pop(month, []))
+        self._counts.pop(month, None)
+
+    def _read_run(self, run_file):
+        """Yield (date, seq, row_data) entries back from a run file"""
+        with open(run_file, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def iter_rows(self, month):
+        """Yield a month's rows in date order (ties keep input order)"""
+        runs = [self._read_run(run_file) for run_file in self._runs.get(month, [])]
+        runs.append(sorted(self._buffers.get(month, [])))
+
+        # (date, seq) is unique, so entries never compare on row_data
+        for _, _, row_data in heapq.merge(*runs):
+            yield row_data
+
+
+class MonthlyTotals:
+    """Running per-month sums, built one row at a time
+
+    Only O(months x categories) numbers are kept, so rows can be streamed
+    straight from the readers without ever being stored. Start and end
+    balances follow date order, whatever order the rows arrive in.
+    """
+
+    def __init__(self):
+        self.months = {}         # {month: totals}
+        self._first = {}         # {month: (date, seq) of earliest row}
+        self._last_balance = {}  # {month: (date, seq) of latest row with a Balance}
+        self._seq = 0
+
+    def add(self, month, row):
+        """Fold one row into its month's totals"""
+        totals = self.months.get(month)
+        if totals is None:
+            totals = self.months[month] = {
+                'expenses': defaultdict(float),
+                'savings_goals': defaultdict(float),
+                'accounts': defaultdict(float),
+                'total_expenses': 0,
+                'total_savings': 0,
+                'total_deposits': 0,
+                'start_balance': 0,
+                'end_balance': 0
+            }
+
+        key = (row['date'], self._seq)
+        self._seq += 1
+
+        # Expenses
+        for cat, val in row['expenses'].items():
+            totals['expenses'][cat] += abs(val)
+            totals['total_expenses'] += abs(val)
+
+        # Savings goals
+        for cat, val in row['savings_goals'].items():
+            totals['savings_goals'][cat] += abs(val)
+            totals['total_savings'] += abs(val)
+
+        accounts = row['accounts']
+
+        # Start balance comes from the month's first row
+        if month not in self._first or key < self._first[month]:
+            self._first[month] = key
+            totals['start_balance'] = accounts.get('Balance', 0)
+
+        # Track balance (last value in month)
+        if 'Balance' in accounts:
+            if month not in self._last_balance or key > self._last_balance[month]:
+                self._last_balance[month] = key
+                totals['end_balance'] = accounts['Balance']
+
+        # Track deposits
+        if 'Deposits' in accounts:
+            totals['total_deposits'] += abs(accounts['Deposits'])
+
+
+def _parse_sheet(config, excel_file, sheet_name, part_file):
+    """Worker: read one sheet's raw rows with its own read-only workbook handle
+
+    The (date, description, cells) rows are written to part_file in batches,
+    as in the raw cache, so neither the worker nor the parent ever holds a
+    whole sheet. Returns the sheet's console output and a diagnostics dict,
+    so the parent can merge and report them in order. Column mapping is left
+    to the parent.
+    """
+    start = time.perf_counter()
+    manager = BudgetManager(config=config)
+    log = io.StringIO()
+    row_count = 0
+    months = set()
+
+    with contextlib.redirect_stdout(log), open(part_file, 'wb') as f:
+        _, _, raw_rows = manager.iter_excel_sheet(excel_file, sheet_name)
+        batch = []
+        for raw in raw_rows:
+            batch.append(raw)
+            months.add(raw[0].strftime('%Y-%m'))
+            row_count += 1
+            if len(batch) >= RAW_BATCH_SIZE:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    diagnostics = {
+        'sheet': sheet_name,
+        'rows': row_count,
+        'months': len(months),
+        'seconds': time.perf_counter() - start
+    }
+    return log.getvalue(), diagnostics
+
+
+def diff_config(old, new):
+    """What changed between two config.json versions
+
+    Returns {'added': [(section, category)], 'removed': [...],
+             'renamed': [(section, old name, new name)],
+             'moved': [(category, old section, new section)],
+             'budgets': [(section, category)], 'aliases': bool,
+             'settings': [changed setting names]}
+    A category is taken as renamed when one name replaces another at the
+    same position in its section (a name edited by hand in config.json).
+    """
+    changes = {'added': [], 'removed': [], 'renamed': [], 'moved': [], 'budgets': [],
+               'aliases': old.get('aliases', {}) != new.get('aliases', {}), 'settings': []}
+
+    sections = ('expenses', 'savings_goals', 'accounts')
+    old_section = {category: section for section in sections for category in old.get(section, {})}
+    new_section = {category: section for section in sections for category in new.get(section, {})}
+
+    for section in sections:
+        old_names = list(old.get(section, {}))
+        new_names = list(new.get(section, {}))
+        removed = [name for name in old_names if name not in new_section]
+        added = [name for name in new_names if name not in old_section]
+
+        for name in list(removed):
+            position = old_names.index(name)
+            if position < len(new_names) and new_names[position] in added:
+                changes['renamed'].append((section, name, new_names[position]))
+                removed.remove(name)
+                added.remove(new_names[position])
+        changes['removed'].extend((section, name) for name in removed)
+        changes['added'].extend((section, name) for name in added)
+
+        for name in new_names:
+            if old_section.get(name, section) != section:
+                changes['moved'].append((name, old_section[name], section))
+            elif name in old.get(section, {}) and old[section][name] != new[section][name]:
+                changes['budgets'].append((section, name))
+
+    old_settings = old.get('settings', {})
+    new_settings = new.get('settings', {})
+    changes['settings'] = sorted(key for key in old_settings.keys() | new_settings.keys()
+                                 if old_settings.get(key) != new_settings.get(key))
+    return changes
+
+
+def config_affects_rows(changes):
+    """True if a diff_config() result changes how rows are mapped or totalled"""
+    return bool(changes['added'] or changes['removed'] or changes['renamed'] or changes['moved']
+                or changes['aliases'] or set(changes['settings']) & set(INGEST_SETTINGS))
+
+
+def category_keys(changes):
+    """{(section, old name): (section, new name) or None} for renamed, moved and removed categories"""
+    keys = {(section, old): (section, new) for section, old, new in changes['renamed']}
+    keys.update(((old_section, name), (new_section, name)) for name, old_section, new_section in changes['moved'])
+    keys.update(((section, name), None) for section, name in changes['removed'])
+    return keys
+
+
+def describe_config_changes(changes):
+    """One line per kind of change, for the log"""
+    lines = []
+    lines += [f"added {name} ({section})" for section, name in changes['added']]
+    lines += [f"removed {name} ({section})" for section, name in changes['removed']]
+    lines += [f"renamed {old} → {new}" for _, old, new in changes['renamed']]
+    lines += [f"moved {name} from {old} to {new}" for name, old, new in changes['moved']]
+    if changes['budgets']:
+        lines.append(f"{len(changes['budgets'])} budget amount(s)")
+    if changes['aliases']:
+        lines.append("aliases")
+    if changes['settings']:
+        lines.append(f"settings: {', '.join(changes['settings'])}")
+    return lines
+
+
+class HeaderMatcher:
+    """Resolve header rows to config categories, caching by header layout
+
+    A header cell matches a category by exact name, by normalized name or
+    alias (case, spaces and punctuation ignored, aliases from the "aliases"
+    section of config.json), or by a close fuzzy match. Common extra
+    columns (IGNORED_HEADERS) are only ever matched exactly, and accounts
+    are never matched fuzzily, since a near miss there ("Deposit",
+    "Balance2") would take over the balance or deposits. The resulting
+    column mapping is cached under a hash of the header row, so files that
+    share a layout are resolved - and warned about - only once.
+    """
+
+    # (config section, label for one, label for many)
+    SECTIONS = (
+        ('expenses', 'expense', 'expenses'),
+        ('savings_goals', 'savings goal', 'savings goals'),
+        ('accounts', 'account', 'accounts'),
+    )
+
+    # Extra columns many sheets have next to the real ones
+    IGNORED_HEADERS = ('Deposit', 'Balance')
+
+    def __init__(self, config, fuzzy=True, cutoff=0.85):
+        self.config = config
+        self.fuzzy = fuzzy
+        self.cutoff = cutoff
+        self._cache = {}  # {header signature: mapping}
+
+        # Normalized category names and aliases -> {(section, category)}
+        self._names = defaultdict(set)
+        aliases = config.get('aliases', {})
+        for section, _, _ in self.SECTIONS:
+            for category in config[section]:
+                self._names[self.normalize(category)].add((section, category))
+                for alias in aliases.get(category, []):
+                    self._names[self.normalize(alias)].add((section, category))
+        self._names.pop('', None)
+
+        # Fuzzy candidates: everything but accounts
+        self._fuzzy_names = {}
+        for name, keys in self._names.items():
+            keys = {key for key in keys if key[0] != 'accounts'}
+            if keys:
+                self._fuzzy_names[name] = keys
+
+    @staticmethod
+    def normalize(text):
+        """Lower-case and drop everything but letters and digits ("Car Ins." -> "carins")"""
+        return re.sub(r'[^0-9a-z]+', '', str(text).lower())
+
+    @staticmethod
+    def signature(header_row):
+        """Short hash identifying a header layout"""
+        cells = ['' if cell is None else str(cell).strip() for cell in header_row]
+        return hashlib.sha1('\x1f'.join(cells).encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def column_name(col_idx, source):
+        """Excel columns are shown as letters, CSV columns as indexes"""
+        from openpyxl.utils import get_column_letter
+        return get_column_letter(col_idx + 1) if source == 'Excel' else col_idx
+
+    def match(self, header_str):
+        """Find the category for one header
+
+        Returns ((section, category), how) on a match, (candidates, 'ambiguous')
+        when several categories fit equally well, or (None, None).
+        """
+        # Exact name, in section order like the config editor
+        for section, _, _ in self.SECTIONS:
+            if header_str in self.config[section]:
+                return (section, header_str), 'exact'
+        if header_str in self.IGNORED_HEADERS:
+            return None, None
+
+        norm = self.normalize(header_str)
+        if not norm:
+            return None, None
+
+        # Normalized name or alias
+        candidates = self._names.get(norm)
+        if candidates:
+            if len(candidates) == 1:
+                return next(iter(candidates)), 'alias'
+            return sorted(candidates), 'ambiguous'
+
+        # Close spelling ("Utilites" -> "Utilities")
+        if self.fuzzy:
+            scored = []
+            for name in difflib.get_close_matches(norm, self._fuzzy_names.keys(), n=5, cutoff=self.cutoff):
+                score = difflib.SequenceMatcher(None, norm, name).ratio()
+                scored.extend((score, candidate) for candidate in self._fuzzy_names[name])
+            if scored:
+                best = max(score for score, _ in scored)
+                top = sorted({candidate for score, candidate in scored if best - score < 0.02})
+                if len(top) == 1:
+                    return top[0], 'fuzzy'
+                return top, 'ambiguous'
+
+        return None, None
+
+    def resolve(self, header_row, source):
+        """Column mapping for a header row, from cache when the layout was seen before"""
+        sig = self.signature(header_row)
+        mapping = self._cache.get(sig)
+        if mapping is not None:
+            print(f"   ✅ Known header layout {sig}: {len(mapping['expenses'])} expenses, "
+                  f"{len(mapping['savings_goals'])} savings, {len(mapping['accounts'])} accounts")
+            return mapping
+
+        mapping = self._resolve(header_row, source, sig)
+        self._cache[sig] = mapping
+        return mapping
+
+    def _resolve(self, header_row, source, sig):
+        """Match every header cell, printing what was found and what was not"""
+        mapping = {section: {} for section, _, _ in self.SECTIONS}
+        labels = {section: label for section, label, _ in self.SECTIONS}
+
+        print(f"   Matching {source} headers to config categories (layout {sig})...")
+
+        for col_idx, header in enumerate(header_row):
+            if not header or col_idx < 2:  # Skip Date and Description columns
+                continue
+
+            header_str = str(header).strip()
+            column = self.column_name(col_idx, source)
+            found, how = self.match(header_str)
+
+            if how == 'ambiguous':
+                names = ', '.join(category for _, category in found)
+                print(f"      ⚠️  Column '{header_str}' could be {names} (ignored - add an alias in config.json)")
+                continue
+
+            if found is None:
+                # Warn about unmatched columns
+                if header_str not in self.IGNORED_HEADERS:
+                    print(f"      ⚠️  Column '{header_str}' in {source} not in config (will be ignored)")
+                continue
+
+            section, category = found
+            if category in mapping[section]:
+                first = self.column_name(mapping[section][category], source)
+                print(f"      ⚠️  Column '{header_str}' also matches {category} (using column {first})")
+                continue
+
+            mapping[section][category] = col_idx
+            note = "" if how == 'exact' else f" (from '{header_str}')"
+            print(f"      Found {labels[section]}: {category} in column {column}{note}")
+
+        # Verify we found all configured categories
+        for section, _, plural in self.SECTIONS:
+            missing = [category for category in self.config[section] if category not in mapping[section]]
+            if missing:
+                print(f"      ⚠️  Config {plural} not in {source}: {', '.join(missing)}")
+
+        print(f"   ✅ Mapped {len(mapping['expenses'])} expenses, {len(mapping['savings_goals'])} savings, "
+              f"{len(mapping['accounts'])} accounts")
+
+        return mapping
+
+
+class BudgetManager:
+    def __init__(self, base_dir=None, config_file=None, inputs_dir=None, report_file=None, config=None):
+        """Set up a manager for one ledger
+
+        With no arguments this uses the app's own folders. Pass base_dir to
+        work on another ledger laid out the same way (tools/config.json,
+        data/inputs/, financial_report.html), override single paths, or
+        hand in an already-loaded config dict.
+        """
+        if base_dir is None:
+            self.base_dir = BASE_DIR
+            default_config, default_inputs, default_report = CONFIG_FILE, INPUTS_DIR, REPORT_FILE
+            self.data_dir = DATA_DIR
+        else:
+            self.base_dir = Path(base_dir)
+            default_config = self.base_dir / "tools" / "config.json"
+            default_inputs = self.base_dir / "data" / "inputs"
+            default_report = self.base_dir / "financial_report.html"
+            self.data_dir = self.base_dir / "data"
+
+        self.config_file = Path(config_file) if config_file else default_config
+        self.inputs_dir = Path(inputs_dir) if inputs_dir else default_inputs
+        self.report_file = Path(report_file) if report_file else default_report
+
+        if config is None:
+            self.config = self.load_config()
+        else:
+            self.config = self.validate_config(dict(config))
+
+        self.settings = self.config['settings']
+        self.monthly_data = MonthStore(  # {month: rows sorted by date}
+            max_rows_in_memory=self.settings['max_rows_in_memory'],
+            spill_dir=self.settings['spill_dir']
+        )
+        self.header_matcher = HeaderMatcher(
+            self.config,
+            fuzzy=self.settings['fuzzy_headers'],
+            cutoff=self.settings['fuzzy_cutoff']
+        )
+        self.sheet_diagnostics = []  # Per-sheet results of the last multi-sheet workbook
+        self.part_mappings = []      # Column mapping of each part of the file being processed
+        self.history_file = self.data_dir / HISTORY_FILE_NAME
+        self.cache_dir = self.data_dir / CACHE_DIR_NAME
+        self.archived = {}       # {month: totals} for compacted months (no rows kept)
+        self._file_months = {}   # {input file name: {'size', 'mtime', 'months'}} from the last run
+        self._history = None  # Cached history_arrays()
+        self._search = None   # SearchIndexBuilder while a report is being written
+
+    def load_config(self):
+        """Load configuration from config.json"""
+        if not self.config_file.exists():
+            print(f"❌ Config file not found: {self.config_file}")
+            print("   Create config.json using budget_editor.html")
+            sys.exit(1)
+
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        return self.validate_config(config)
+
+    def validate_config(self, config):
+        """Check required sections and fill in default settings"""
+        # Validate config structure
+        required_keys = ['expenses', 'savings_goals', 'accounts']
+        for key in required_keys:
+            if key not in config:
+                print(f"❌ Config missing required key: {key}")
+                sys.exit(1)
+
+        # Fill in defaults for any settings not given
+        config['settings'] = {**DEFAULT_SETTINGS, **config.get('settings', {})}
+
+        return config
+
+    def find_input_files(self):
+        """Find Excel and CSV files in data/inputs/"""
+        input_files = (
+            list(self.inputs_dir.glob('*.xlsx')) +
+            list(self.inputs_dir.glob('*.xls')) +
+            list(self.inputs_dir.glob('*.csv'))
+        )
+        input_files = [f for f in input_files if not f.name.startswith('~')]  # Ignore temp files
+        return input_files
+
+    def parse_date(self, date_value):
+        """Parse date from Excel (handles MM/DD/YYYY and datetime objects)"""
+        if isinstance(date_value, datetime):
+            return date_value
+
+        if isinstance(date_value, str):
+            date_value = date_value.strip()
+            # Try MM/DD/YYYY format
+            try:
+                return datetime.strptime(date_value, '%m/%d/%Y')
+            except:
+                pass
+            # Try other common formats
+            for fmt in ['%Y-%m-%d', '%m-%d-%Y', '%d/%m/%Y', '%d.%m.%Y']:
+                try:
+                    return datetime.strptime(date_value, fmt)
+                except:
+                    continue
+
+        return None
+
+    def map_columns(self, header_row, source):
+        """Match header cells to config categories
+
+        Returns {'expenses': {category: col_idx}, 'savings_goals': {...}, 'accounts': {...}}
+        """
+        return self.header_matcher.resolve(header_row, source)
+
+    def extract_rows(self, rows, mapping):
+        """Turn sheet/CSV rows into (month, row_data) pairs, stopping at the Totals row"""
+        return self.map_raw(self.extract_raw(rows), mapping)
+
+    @staticmethod
+    def map_raw(raw_rows, mapping):
+        """Apply a column mapping to (date, description, cells) rows, giving (month, row_data)"""
+        for trans_date, description, cells in raw_rows:
+            row_data = {
+                'date': trans_date,
+                'description': description,
+                'expenses': {},
+                'savings_goals': {},
+                'accounts': {}
+            }
+
+            # Expenses, savings goals and account tracking
+            for section, columns in mapping.items():
+                values = row_data[section]
+                for category, col_idx in columns.items():
+                    if col_idx in cells:
+                        values[category] = cells[col_idx]
+
+            # Group by month
+            yield trans_date.strftime('%Y-%m'), row_data
+
+    def extract_raw(self, rows):
+        """Turn sheet/CSV rows into (date, description, {col_idx: amount}), stopping at the Totals row
+
+        Every amount column is kept, whatever the config says, so the rows
+        can be re-mapped after config.json changes without reading the file.
+        """
+        date_col = 0  # Column A (should be "Date")
+        desc_col = 1  # Column B (should be description)
+
+        for row in rows:
+            # Skip empty rows
+            if not row or not row[0]:
+                continue
+
+            # Check for Totals row
+            if str(row[0]).strip().lower() == 'totals':
+                print(f"   Found Totals row, stopping")
+                break
+
+            # Parse date
+            trans_date = self.parse_date(row[date_col])
+            if not trans_date:
+                continue
+
+            # Get description
+            description = str(row[desc_col]) if len(row) > desc_col and row[desc_col] else ""
+
+            # Every non-empty amount from column C on
+            cells = {}
+            for col_idx in range(desc_col + 1, len(row)):
+                value = row[col_idx]
+                if value:
+                    try:
+                        cells[col_idx] = float(value)
+                    except (TypeError, ValueError):
+                        # "$1,234.56", "(12.00)"... anything else is skipped
+                        amount = parse_amount(value)
+                        if amount is not None:
+                            cells[col_idx] = amount
+
+            yield trans_date, description, cells
+
+    def iter_excel_sheet(self, excel_file, sheet_name=None):
+        """One sheet of an Excel file (default: active sheet) as ('Excel', header row, raw rows)
+
+        The raw rows are streamed; the workbook closes once they are used up.
+        """
+        if sheet_name is None:
+            print(f"\n📊 Processing: {excel_file.name}")
+        else:
+            print(f"\n📊 Processing: {excel_file.name} [{sheet_name}]")
+
+        import openpyxl
+
+        # Read-only mode streams rows instead of loading the whole workbook
+        wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+        ws = wb.active if sheet_name is None else wb[sheet_name]
+        header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+
+        def raw_rows():
+            try:
+                yield from self.extract_raw(ws.iter_rows(min_row=2, values_only=True))
+            finally:
+                wb.close()
+
+        return 'Excel', header_row, raw_rows()
+
+    def select_sheets(self, excel_file):
+        """Sheet names to read from a workbook, per the excel_sheets setting
+
+        "active" (the default) returns [None] for the active sheet only,
+        "all" returns every sheet, anything else is one or more name
+        patterns such as "20*" (case-insensitive).
+        """
+        selection = self.settings['excel_sheets']
+        if selection == 'active':
+            return [None]
+
+        import openpyxl
+        wb = openpyxl.load_workbook(excel_file, read_only=True)
+        try:
+            sheet_names = wb.sheetnames
+        finally:
+            wb.close()
+
+        if selection == 'all':
+            return sheet_names
+
+        patterns = [selection] if isinstance(selection, str) else selection
+        selected = [name for name in sheet_names
+                    if any(fnmatch.fnmatch(name.lower(), p.lower()) for p in patterns)]
+
+        if not selected:
+            print(f"\n⚠️  No sheets in {excel_file.name} match {', '.join(patterns)} "
+                  f"(sheets: {', '.join(sheet_names)})")
+        return selected
+
+    def iter_workbook_parts(self, excel_file, sheet_names):
+        """Parse several sheets at once, one worker process per sheet
+
+        Yields ('Excel', header row, raw rows) per sheet, in sheet order.
+        Workers write their rows to temp files in spill_dir, which are
+        streamed back here, so memory use doesn't grow with the sheets.
+        """
+        workers = self.settings['sheet_workers'] or min(len(sheet_names), os.cpu_count() or 1)
+        print(f"\n📚 Reading {len(sheet_names)} sheets from {excel_file.name} on {workers} workers")
+
+        import openpyxl
+
+        # Header rows are read here; the workers only turn rows into raw amounts
+        wb = openpyxl.load_workbook(excel_file, read_only=True)
+        try:
+            headers = {name: next(wb[name].iter_rows(min_row=1, max_row=1, values_only=True), ())
+                       for name in sheet_names}
+        finally:
+            wb.close()
+
+        self.sheet_diagnostics = []
+        tmpdir = Path(tempfile.mkdtemp(prefix='budget_sheets_', dir=self.settings['spill_dir']))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                jobs = [pool.submit(_parse_sheet, self.config, excel_file, name, tmpdir / f"sheet-{i:03d}.pickle")
+                        for i, name in enumerate(sheet_names)]
+
+                for i, (name, job) in enumerate(zip(sheet_names, jobs)):
+                    log, diagnostics = job.result()
+                    print(log, end='')
+                    print(f"   📑 Sheet '{name}'")
+                    self.sheet_diagnostics.append(diagnostics)
+                    yield 'Excel', headers[name], self._read_raw_part(tmpdir / f"sheet-{i:03d}.pickle")
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        # process_file() has mapped every sheet by the time the last one is consumed
+        for d, mapping in zip(self.sheet_diagnostics, self.part_mappings):
+            d['expenses'] = len(mapping['expenses'])
+            d['savings_goals'] = len(mapping['savings_goals'])
+            d['accounts'] = len(mapping['accounts'])
+
+        print(f"\n   📑 Sheet summary for {excel_file.name}:")
+        for d in self.sheet_diagnostics:
+            mapped = (f", {d['expenses']} expenses / {d['savings_goals']} savings / {d['accounts']} accounts mapped"
+                      if 'expenses' in d else "")
+            print(f"      {d['sheet']}: {d['rows']} rows, {d['months']} months{mapped} ({d['seconds']:.2f}s)")
+
+    def iter_csv_sheet(self, csv_file):
+        """A CSV file (any encoding or delimiter) as ('CSV', header row, raw rows)"""
+        print(f"\n📊 Processing: {csv_file.name}")
+
+        source = CsvFile(csv_file)
+        print(f"   📄 Format: {source.describe()}")
+
+        batches = source.batches()
+        header_row = next(batches)
+        return 'CSV', header_row, self.extract_raw(chain.from_iterable(batches))
+
+    def iter_parts(self, input_file):
+        """Yield (source, header row, raw rows) for each sheet read from input_file"""
+        # Detect file type and use appropriate reader
+        if input_file.suffix.lower() == '.csv':
+            yield self.iter_csv_sheet(input_file)
+        else:  # .xlsx or .xls
+            sheet_names = self.select_sheets(input_file)
+            if len(sheet_names) > 1:
+                yield from self.iter_workbook_parts(input_file, sheet_names)
+            elif sheet_names:
+                yield self.iter_excel_sheet(input_file, sheet_names[0])
+
+    def raw_cache_dir(self, input_file):
+        return self.cache_dir / 'raw' / input_file.name
+
+    def cached_parts(self, input_file):
+        """Raw parts of input_file from data/cache/raw/, or None if missing or out of date
+
+        The raw cache holds every amount column, not the config's mapping,
+        so it stays valid whatever happens to config.json.
+        """
+        index = self._raw_index(input_file)
+        if index is None:
+            return None
+
+        def parts():
+            print(f"\n📊 Processing: {input_file.name} (cached columns)")
+            for i, (source, header_row) in enumerate(index['parts']):
+                yield source, header_row, self._read_raw_part(self.raw_cache_dir(input_file) / f"part-{i:03d}.pickle")
+        return parts()
+
+    def _raw_index(self, input_file):
+        """index.pickle of input_file's raw cache, or None if missing or out of date"""
+        try:
+            with open(self.raw_cache_dir(input_file) / 'index.pickle', 'rb') as f:
+                index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        if (index.get('version') != CACHE_VERSION or index['fingerprint'] != self._fingerprint(input_file)
+                or index['excel_sheets'] != self.settings['excel_sheets']):
+            return None
+        return index
+
+    @staticmethod
+    def _read_raw_part(part_file):
+        with open(part_file, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _caching_parts(self, input_file, parts):
+        """Pass parts through while saving their raw rows; the index is written last"""
+        folder = self.raw_cache_dir(input_file)
+        shutil.rmtree(folder, ignore_errors=True)
+        folder.mkdir(parents=True)
+
+        index = []
+        for i, (source, header_row, raw_rows) in enumerate(parts):
+            index.append((source, list(header_row)))
+            yield source, header_row, self._tee_raw(folder / f"part-{i:03d}.pickle", raw_rows)
+
+        with atomic_write(folder / 'index.pickle', 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'fingerprint': self._fingerprint(input_file),
+                         'excel_sheets': self.settings['excel_sheets'], 'parts': index}, f)
+
+    @staticmethod
+    def _tee_raw(part_file, raw_rows):
+        with atomic_write(part_file, 'wb') as f:
+            batch = []
+            for raw in raw_rows:
+                batch.append(raw)
+                if len(batch) >= RAW_BATCH_SIZE:
+                    pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    batch = []
+                yield raw
+            if batch:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def process_file(self, input_file, add_row=None):
+        """Read one Excel or CSV file, handing each row to add_row(month, row_data)
+
+        By default rows are kept in self.monthly_data for the full report.
+        Files read before come from their raw column cache instead of being
+        parsed again; only the (cheap) config mapping is redone.
+        """
+        if add_row is None:
+            add_row = self.monthly_data.append
+
+        parts = self.cached_parts(input_file)
+        if parts is None:
+            parts = self._caching_parts(input_file, self.iter_parts(input_file))
+
+        row_count = 0
+        months = set()
+        self.part_mappings = []
+        for source, header_row, raw_rows in parts:
+            mapping = self.map_columns(header_row, source)
+            self.part_mappings.append(mapping)
+            for month_key, row_data in self.map_raw(raw_rows, mapping):
+                add_row(month_key, row_data)
+                months.add(month_key)
+                row_count += 1
+
+        print(f"   ✅ Processed {row_count} rows across {len(months)} months")
+        return True
+
+    def process_excel_file(self, excel_file):
+        """Process Excel file based on config.json structure"""
+        return self.process_file(excel_file)
+
+    def process_csv_file(self, csv_file):
+        """Process CSV file based on config.json structure"""
+        return self.process_file(csv_file)
+
+    def calculate_monthly_totals(self):
+        """Calculate totals for each month"""
+        totals = MonthlyTotals()
+
+        # Rows come back in date order
+        for month in self.monthly_data.months():
+            for row in self.monthly_data.iter_rows(month):
+                totals.add(month, row)
+
+        return totals.months
+
+    def load_history(self):
+        """Read the compacted months and input fingerprints saved by earlier runs"""
+        self.archived = {}
+        self._file_months = {}
+        if not self.history_file.exists():
+            return
+
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read {self.history_file.name} ({e}), keeping every month in detail")
+            return
+
+        self.archived = history.get('months', {})
+        self._file_months = history.get('files', {})
+        if self.archived:
+            print(f"📦 {len(self.archived)} archived months loaded from {self.history_file.name}")
+
+    @staticmethod
+    def _fingerprint(input_file):
+        stat = input_file.stat()
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    def content_hash(self, input_files, summary_only=False):
+        """Hash of everything the report is built from: input fingerprints and config
+
+        The generated-on timestamp is not part of it, so identical inputs
+        always give the same hash.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"format {REPORT_FORMAT} summary_only {bool(summary_only)}\n".encode('utf-8'))
+        digest.update(json.dumps(self.config, sort_keys=True).encode('utf-8'))
+        for input_file in sorted(input_files):
+            fingerprint = self._fingerprint(input_file)
+            digest.update(f"\n{input_file.name}\0{fingerprint['size']}\0{fingerprint['mtime']}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def report_hash(self):
+        """Content hash stored in the existing report, or None"""
+        try:
+            with open(self.report_file, 'r', encoding='utf-8') as f:
+                head = f.read(4096)
+        except (OSError, UnicodeDecodeError):
+            return None
+        match = HASH_META_RE.search(head)
+        return match.group(1) if match else None
+
+    def export_hash(self):
+        """Content hash stored in the exported workbook, or None
+
+        Read from docProps/core.xml directly, without loading the workbook.
+        """
+        try:
+            with zipfile.ZipFile(self.report_file.with_suffix('.xlsx')) as zf:
+                core = zf.read('docProps/core.xml').decode('utf-8')
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return None
+        match = HASH_XLSX_RE.search(core)
+        return match.group(1) if match else None
+
+    def is_up_to_date(self, content_hash, export=False, summary_only=False):
+        """True if every output of a run was written from content_hash"""
+        if self.report_hash() != content_hash:
+            return False
+        if export and self.export_hash() != content_hash:
+            return False
+        meta = self.cache_meta()
+        if meta is None or meta['content_hash'] != content_hash:
+            return False
+        return all(p.exists() for p in self.output_files(export, summary_only))
+
+    def output_files(self, export=False, summary_only=False):
+        """Every file a run writes with the current settings"""
+        files = [self.report_file]
+        if self.settings['gzip_report']:
+            files.append(self.report_file.with_name(self.report_file.name + '.gz'))
+        if self.settings['compact_report']:
+            files.append(self.report_file.parent / REPORT_CSS_NAME)
+        if self.settings['search_index'] == 'sidecar' and not summary_only:
+            files.append(self.report_file.with_suffix('.search.js'))
+        if export:
+            files.append(self.report_file.with_suffix('.xlsx'))
+        files.append(self.cache_dir / 'meta.json')
+        return files
+
+    def save_cache(self, monthly_totals, content_hash, input_files, summary_only=False):
+        """Persist parsed rows and monthly totals to data/cache/
+
+        rows.pickle holds one (month, rows) record per month in date order,
+        totals.json the totals of every month (archived ones included) and
+        meta.json what they were built from. meta.json is written last, so
+        a cache interrupted half-way is never mistaken for a complete one.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        meta_file = self.cache_dir / 'meta.json'
+        meta_file.unlink(missing_ok=True)
+
+        rows_file = self.cache_dir / 'rows.pickle'
+        if self.monthly_data:
+            with atomic_write(rows_file, 'wb') as f:
+                for month in sorted(self.monthly_data.months()):
+                    pickle.dump((month, list(self.monthly_data.iter_rows(month))), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            rows_file.unlink(missing_ok=True)
+
+        write_if_changed(self.cache_dir / 'totals.json', json.dumps(monthly_totals, sort_keys=True))
+
+        self.save_cache_meta({
+            'version': CACHE_VERSION,
+            'summary_only': bool(summary_only),
+            'files': {input_file.name: self._fingerprint(input_file) for input_file in input_files},
+            'rows': self.monthly_data.row_count(),
+            'months': len(monthly_totals),
+            'archived_months': len(self.archived),
+        }, content_hash)
+
+    def save_cache_meta(self, meta, content_hash):
+        """Write meta.json for the current config and content_hash (rows and totals as they are)"""
+        meta = dict(meta, content_hash=content_hash, config=self.config, report_format=REPORT_FORMAT,
+                    created=datetime.now().isoformat(timespec='seconds'))
+        write_if_changed(self.cache_dir / 'meta.json', json.dumps(meta, indent=1))
+
+    def cache_meta(self):
+        """meta.json of the cache, or None if there is no usable cache"""
+        try:
+            with open(self.cache_dir / 'meta.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == CACHE_VERSION else None
+
+    def cached_totals(self):
+        """{month: totals} from the cache"""
+        with open(self.cache_dir / 'totals.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_cached_rows(self, patch=None):
+        """Fill the month store from the cache (nothing to load for summary-only caches)
+
+        patch(month, rows), if given, updates each month's rows in place on the way in.
+        """
+        rows_file = self.cache_dir / 'rows.pickle'
+        if not rows_file.exists():
+            return
+        with open(rows_file, 'rb') as f:
+            while True:
+                try:
+                    month, rows = pickle.load(f)
+                except EOFError:
+                    return
+                if patch is not None:
+                    patch(month, rows)
+                for row in rows:
+                    self.monthly_data.append(month, row)
+
+    def can_reuse_cache(self, meta):
+        """True if the cached totals still hold: same inputs, and config.json
+        changes (if any) leave every category's totals as they were"""
+        plan = self.plan_cache_update(meta, meta['summary_only'])
+        return plan is not None and not plan['keys'] and not plan['columns']
+
+    def plan_cache_update(self, meta, summary_only=False):
+        """How to bring the cache in line with config.json without reading data/inputs/
+
+        Returns None when the inputs changed or a config change needs a full
+        ingest, otherwise a dict:
+            'keys'     category_keys(): categories to rename, move or drop
+            'columns'  {(section, category)} whose source column changed,
+                       to be re-read from the raw cache
+            'sections' report sections to redo when only budgets or highlight
+                       settings changed (see refresh_sections()), or None
+                       when the whole report must be written again
+        """
+        if meta['summary_only'] != bool(summary_only):
+            return None
+        if [change for change in self.cache_changes(meta) if change != "config.json changed"]:
+            return None
+
+        changes = diff_config(meta['config'], self.config)
+        lines = describe_config_changes(changes)
+        if lines:
+            print(f"\n⚙️  config.json changed: {'; '.join(lines)}")
+        if set(changes['settings']) & {'excel_sheets', 'summary_only', 'detail_months'}:
+            return None
+
+        # Balance and Deposits drive the balances and deposits, so account changes are re-ingested
+        keys = category_keys(changes)
+        touched = list(keys) + [key for key in keys.values() if key] + changes['added']
+        if any(section == 'accounts' for section, _ in touched):
+            return None
+
+        columns = set()
+        if config_affects_rows(changes):
+            columns = self.changed_columns(meta['config'], keys)
+            if columns is None or any(section == 'accounts' for section, _ in columns):
+                return None
+
+        settings = set(changes['settings']) - set(RUNTIME_SETTINGS)
+        sections = None
+        if meta.get('report_format') == REPORT_FORMAT and not (
+                keys or columns or changes['added'] or settings - set(HIGHLIGHT_SETTINGS)):
+            # Expense budgets feed the highlights, savings goals the goal lines of the savings chart
+            budget_sections = {section for section, _ in changes['budgets']}
+            sections = set()
+            if self.settings['highlights'] and ('expenses' in budget_sections or settings):
+                sections.add('highlights')
+            if self.settings['charts'] and 'savings_goals' in budget_sections:
+                sections.add('savings-chart')
+        return {'keys': keys, 'columns': columns, 'sections': sections}
+
+    def changed_columns(self, old_config, keys):
+        """Categories whose source column differs between old_config and the current config
+
+        Both header mappings of every part in the raw cache are compared, old
+        names translated through keys. None if an input has no raw cache.
+        """
+        old_settings = old_config['settings']
+        old_matcher = HeaderMatcher(old_config, fuzzy=old_settings['fuzzy_headers'],
+                                    cutoff=old_settings['fuzzy_cutoff'])
+        columns = set()
+        for input_file in self.find_input_files():
+            index = self._raw_index(input_file)
+            if index is None:
+                return None
+            for source, header_row in index['parts']:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    old = old_matcher.resolve(header_row, source)
+                    new = self.header_matcher.resolve(header_row, source)
+                before = {keys.get((section, category), (section, category)): col_idx
+                          for section, categories in old.items() for category, col_idx in categories.items()}
+                after = {(section, category): col_idx
+                         for section, categories in new.items() for category, col_idx in categories.items()}
+                columns.update(key for key in before.keys() | after.keys()
+                               if key is not None and before.get(key) != after.get(key))
+        return columns
+
+    def update_cache(self, plan):
+        """Apply a plan_cache_update() plan to the cached totals and rows, returning {month: totals}
+
+        Renamed, moved and removed categories are re-keyed in place; only
+        the columns in plan['columns'] are read again from the raw cache.
+        """
+        keys, columns = plan['keys'], plan['columns']
+        monthly_totals = self.cached_totals()
+        for totals in monthly_totals.values():
+            self._rekey(totals, keys)
+
+        if self.settings['detail_months'] > 0:
+            self.load_history()
+
+        sums, row_values = self._read_columns(columns) if columns else ({}, None)
+        for month, totals in monthly_totals.items():
+            month_sums = sums.get(month, {})
+            for section, category in columns:
+                totals[section].pop(category, None)
+                new = month_sums.get((section, category), 0)
+                if new:
+                    totals[section][category] = new
+
+        # Sum the section totals again rather than patching them, so they come
+        # out as if the month had been totalled from scratch
+        if keys or columns:
+            for totals in monthly_totals.values():
+                for section, total_key in SECTION_TOTALS.items():
+                    totals[total_key] = sum(totals[section].values())
+
+        def patch(month, rows):
+            # Both sides hold the month's rows in (date, input order) order
+            values = iter(row_values.iter_rows(month) if row_values is not None and month in row_values else ())
+            for row in rows:
+                self._rekey(row, keys)
+                entry = next(values, None)
+                if entry is None:
+                    continue
+                for section, category in columns:
+                    row[section].pop(category, None)
+                for (section, category), value in entry['values'].items():
+                    row[section][category] = value
+
+        self.load_cached_rows(patch if keys or columns else None)
+
+        if self.archived and (keys or columns):
+            self.archived = {month: monthly_totals[month] for month in self.archived}
+            self._save_history()
+
+        if keys or columns:
+            print(f"   🔁 Updated {len(keys)} renamed/moved/removed and {len(columns)} re-mapped categories")
+        return monthly_totals
+
+    @staticmethod
+    def _rekey(record, keys):
+        """Rename, move or drop categories in a row or a month's totals"""
+        for (section, category), target in keys.items():
+            value = record[section].pop(category, None)
+            if value is not None and target is not None:
+                record[target[0]][target[1]] = value
+
+    def _read_columns(self, columns):
+        """Read just the given categories' columns from the raw cache of every input
+
+        Returns ({month: {(section, category): sum}}, MonthStore of
+        {'date', 'values': {(section, category): value}} per row). The store
+        lists each month in the same (date, input order) order as rows.pickle
+        and spills like the main one, so re-mapping a column never holds every
+        row; it is None for summary-only caches.
+        """
+        sums = defaultdict(lambda: defaultdict(float))
+        row_values = None
+        if (self.cache_dir / 'rows.pickle').exists():
+            row_values = MonthStore(max_rows_in_memory=self.settings['max_rows_in_memory'],
+                                    spill_dir=self.settings['spill_dir'])
+
+        for input_file in self.find_input_files():
+            folder = self.raw_cache_dir(input_file)
+            for i, (source, header_row) in enumerate(self._raw_index(input_file)['parts']):
+                mapping = self.header_matcher.resolve(header_row, source)
+                wanted = [((section, category), mapping[section][category])
+                          for section, category in columns if category in mapping[section]]
+                for trans_date, _, cells in self._read_raw_part(folder / f"part-{i:03d}.pickle"):
+                    month = trans_date.strftime('%Y-%m')
+                    values = {key: cells[col_idx] for key, col_idx in wanted if col_idx in cells}
+                    for key, value in values.items():
+                        sums[month][key] += abs(value)
+                    if row_values is not None and month not in self.archived:
+                        row_values.append(month, {'date': trans_date, 'values': values})
+
+        return sums, row_values
+
+    def cache_changes(self, meta):
+        """What changed since the cache was built: a list of reasons (empty = current)"""
+        changes = []
+        if meta['config'] != json.loads(json.dumps(self.config)):
+            changes.append("config.json changed")
+
+        current = {input_file.name: input_file for input_file in self.find_input_files()}
+        for name, fingerprint in meta['files'].items():
+            if name not in current:
+                changes.append(f"{name} removed")
+            elif self._fingerprint(current[name]) != fingerprint:
+                changes.append(f"{name} changed")
+        changes.extend(f"{name} added" for name in sorted(current.keys() - meta['files'].keys()))
+        return changes
+
+    def is_archived_file(self, input_file):
+        """True if input_file is unchanged since it was last read and all its months are archived"""
+        seen = self._file_months.get(input_file.name)
+        if not seen or not self.archived:
+            return False
+
+        fingerprint = self._fingerprint(input_file)
+        return (seen['size'] == fingerprint['size'] and seen['mtime'] == fingerprint['mtime']
+                and all(month in self.archived for month in seen['months']))
+
+    def reaggregate_archived(self, input_files, file_months, reopened):
+        """Rebuild archived months that an edited, added or removed input file held
+
+        file_months: {input file: months it held} for the files read this run;
+        reopened: a MonthlyTotals of their rows for archived months. Files
+        skipped as unchanged are read again when they share one of those
+        months, so each month is rebuilt from all of its rows.
+        """
+        present = {input_file.name for input_file in input_files}
+        stale = set()
+        for input_file, months in file_months.items():
+            seen = self._file_months.get(input_file.name)
+            if seen is None:
+                stale.update(months)
+            elif {'size': seen['size'], 'mtime': seen['mtime']} != self._fingerprint(input_file):
+                stale.update(months)
+                stale.update(seen['months'])
+        for name, seen in self._file_months.items():
+            if name not in present:
+                stale.update(seen['months'])
+        stale &= self.archived.keys()
+        if not stale:
+            return
+
+        skipped = [input_file for input_file in input_files if input_file not in file_months
+                   and stale.intersection(self._file_months.get(input_file.name, {}).get('months', ()))]
+        if skipped:
+            # Read every contributing file again, in input order, for the stale months only
+            reopened = MonthlyTotals()
+
+            def add(month_key, row_data):
+                if month_key in stale:
+                    reopened.add(month_key, row_data)
+
+            for input_file in input_files:
+                if input_file in skipped or stale.intersection(file_months.get(input_file, ())):
+                    self.process_file(input_file, add)
+
+        changed = []
+        for month in sorted(stale):
+            totals = reopened.months.get(month)
+            if totals is None:
+                del self.archived[month]  # No rows left for it
+            elif json.loads(json.dumps(totals)) != self.archived[month]:
+                self.archived[month] = totals
+            else:
+                continue
+            changed.append(month)
+
+        if changed:
+            print(f"⚠️  Edited inputs changed archived months, totals re-aggregated: {', '.join(changed)}")
+
+    def compact_history(self, monthly_totals, file_months):
+        """Roll months older than the detail_months horizon into summary records
+
+        Their totals move from monthly_totals into self.archived, their rows
+        are dropped from the store, and both are saved to the history file
+        with each input file's fingerprint and months (file_months:
+        {input file: months it held}) so unchanged files can be skipped.
+        """
+        all_months = set(self.archived) | set(monthly_totals)
+        if not all_months:
+            return
+
+        # Horizon counts back from the newest month
+        year, month = map(int, max(all_months).split('-'))
+        index = year * 12 + month - 1 - self.settings['detail_months']
+        cutoff = f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+        newly_archived = sorted(m for m in monthly_totals if m <= cutoff)
+        for month in newly_archived:
+            self.archived[month] = monthly_totals.pop(month)
+            self.monthly_data.discard(month)
+        if newly_archived:
+            print(f"📦 Archived {len(newly_archived)} months up to {cutoff} (summary only from now on)")
+
+        for input_file, months in file_months.items():
+            self._file_months[input_file.name] = dict(self._fingerprint(input_file), months=sorted(months))
+        present = {input_file.name for input_file in self.find_input_files()}
+        self._file_months = {name: seen for name, seen in self._file_months.items() if name in present}
+        self._save_history()
+
+    def _save_history(self):
+        history = {'version': 1, 'months': dict(sorted(self.archived.items())), 'files': self._file_months}
+        write_if_changed(self.history_file, json.dumps(history, indent=1))
+
+    def generate_html_report(self, monthly_totals=None, content_hash=None):
+        """Generate beautiful HTML report
+
+        Pass monthly_totals from a summary-only run to skip the row store.
+        content_hash (see content_hash()) is stored in the report so the next
+        run can tell nothing changed.
+        """
+        print("\n📄 Generating HTML report...")
+
+        if monthly_totals is None:
+            monthly_totals = self.calculate_monthly_totals()
+
+        # Sort months
+        sorted_months = sorted(monthly_totals.keys(), reverse=True)
+
+        # Generate HTML - continuing in next message due to length
+        html_start = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Mom's Budget Report</title>
+""" + (f'    <meta name="budget-content-hash" content="{content_hash}">\n' if content_hash else "") \
+            + self._report_styles() + """</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>💰 BUDGET REPORT</h1>
+            <p>Generated on """ + datetime.now().strftime('%B %d, %Y at %I:%M %p') + """</p>
+        </div>
+
+        <div class="content">
+"""
+
+        html_end = """
+        </div>
+
+        <div class="footer">
+            Made with ❤️ for Mom
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+        # Balance check needs the rows, so it is skipped in summary-only runs
+        reconciliation = None
+        if self.settings['reconcile_balances'] and self.monthly_data:
+            reconciliation = self.reconcile_balances()
+
+        # Search index is filled in while the transaction log is written
+        search_mode = self.settings['search_index']
+        self._search = None
+        if search_mode != 'off' and self.monthly_data:
+            self._search = SearchIndexBuilder(spill_dir=self.settings['spill_dir'])
+
+        # Write HTML file as we go so the transaction log is streamed, not built in memory
+        with atomic_write(self.report_file, 'w', encoding='utf-8') as f:
+            f.write(html_start)
+            if self._search is not None:
+                f.write(SEARCH_BOX_HTML)
+            if self.settings['highlights'] and sorted_months:
+                self._write_highlights(f, monthly_totals)
+            if reconciliation:
+                self._write_reconciliation(f, reconciliation)
+            if self.settings['charts'] and sorted_months:
+                self._write_charts(f, monthly_totals)
+            self._write_months(f, sorted_months, monthly_totals)
+            if self._search is not None:
+                self._write_search_index(f, search_mode)
+            f.write(html_end)
+
+        print(f"✅ Report saved: {self.report_file}")
+
+        if self.settings['gzip_report']:
+            gz_file = self._write_gzip_copy(self.report_file)
+            print(f"✅ Compressed copy saved: {gz_file}")
+
+        return self.report_file
+
+    def export_excel(self, monthly_totals, content_hash=None):
+        """Write the merged ledger and monthly totals to an .xlsx next to the report
+
+        Rows are streamed from the month store through a write-only workbook;
+        the totals sheet uses the same monthly_totals as the HTML report.
+        content_hash is stamped into the workbook (see export_hash()).
+        """
+        from finance_export import export_workbook
+
+        print("\n📗 Exporting Excel workbook...")
+        export_file = self.report_file.with_suffix('.xlsx')
+        with atomic_write(export_file, 'wb') as f:
+            written = export_workbook(self.monthly_data, self.config, f, monthly_totals,
+                                      content_hash=content_hash)
+
+        print(f"✅ Workbook saved: {export_file} ({written} transactions)")
+        return export_file
+
+    def history_arrays(self):
+        """Day number, signed change and recorded balance (NaN if none) for every row
+
+        Built in one pass over the month store, in date order, and kept as
+        compact float arrays for the balance check and the charts. This
+        pass is per-row Python, as the rows are dicts streamed from the
+        store; the check run on the arrays is what numpy vectorizes.
+        """
+        if self._history is None:
+            from finance_reconcile import row_change
+
+            days = array('d')
+            changes = array('d')
+            balances = array('d')
+            for month in sorted(self.monthly_data.months()):
+                for row in self.monthly_data.iter_rows(month):
+                    days.append(row['date'].toordinal())
+                    changes.append(row_change(row))
+                    balances.append(row['accounts'].get('Balance', math.nan))
+            self._history = (days, changes, balances)
+
+        return self._history
+
+    def reconcile_balances(self):
+        """Check every recorded Balance against the running balance of the whole history
+
+        Returns the finance_reconcile result with each mismatch expanded to
+        {'date', 'description', 'expected', 'recorded', 'difference'}.
+        """
+        from finance_reconcile import reconcile
+
+        months = sorted(self.monthly_data.months())
+        _, changes, balances = self.history_arrays()
+
+        result = reconcile(changes, balances, self.settings['reconcile_tolerance'])
+        result['rows'] = len(changes)
+
+        # Second pass to pick up the flagged rows themselves
+        flagged = {index: (expected, recorded, difference)
+                   for index, expected, recorded, difference in result['mismatches']}
+        mismatches = []
+        if flagged:
+            index = 0
+            for month in months:
+                for row in self.monthly_data.iter_rows(month):
+                    if index in flagged:
+                        expected, recorded, difference = flagged[index]
+                        mismatches.append({
+                            'date': row['date'],
+                            'description': row['description'],
+                            'expected': expected,
+                            'recorded': recorded,
+                            'difference': difference
+                        })
+                    index += 1
+        result['mismatches'] = mismatches
+
+        if mismatches:
+            print(f"⚠️  Balance check: {len(mismatches)} rows don't add up "
+                  f"(first on {mismatches[0]['date']:%m/%d/%Y})")
+        else:
+            print(f"✅ Balance check: all {result['checked']} recorded balances add up")
+
+        return result
+
+    def _write_reconciliation(self, f, result):
+        """Balance check section at the top of the report"""
+        mismatches = result['mismatches']
+        status = 'negative' if mismatches else 'positive'
+
+        section = f"""
+            <div class="month-section">
+                <div class="month-header">
+                    🧾 Balance Check
+                </div>
+                <div class="month-content">
+                    <div class="summary-cards">
+                        <div class="summary-card">
+                            <div class="label">Balances Checked</div>
+                            <div class="value">{result['checked']:,}</div>
+                        </div>
+                        <div class="summary-card {status}">
+                            <div class="label">Mismatches</div>
+                            <div class="value">{len(mismatches):,}</div>
+                        </div>
+                        <div class="summary-card">
+                            <div class="label">Total Drift</div>
+                            <div class="value">${result['drift']:,.2f}</div>
+                        </div>
+                    </div>
+"""
+
+        if not mismatches:
+            section += """
+                    <p class="notice">✅ Every recorded balance equals Previous Balance - Expenses - Savings + Deposits.</p>
+"""
+        else:
+            section += f"""
+                    <p class="notice">⚠️ These rows' Balance doesn't equal Previous Balance - Expenses - Savings + Deposits.
+                    Each row is where a new difference starts.</p>
+                    <table class="data-table">
+                        <thead>
+                            <tr><th>Date</th><th>Description</th><th class="r">Expected</th><th class="r">Recorded</th><th class="r">Difference</th></tr>
+                        </thead>
+                        <tbody>
+"""
+            for m in mismatches[:MAX_RECONCILE_ROWS]:
+                section += (f"                            <tr><td>{m['date']:%m/%d/%Y}</td>"
+                            f"<td>{html.escape(m['description'])}</td>"
+                            f"<td class=\"r\">${m['expected']:,.2f}</td>"
+                            f"<td class=\"r\">${m['recorded']:,.2f}</td>"
+                            f"<td class=\"r\">${m['difference']:,.2f}</td></tr>\n")
+            section += """
+                        </tbody>
+                    </table>
+"""
+            if len(mismatches) > MAX_RECONCILE_ROWS:
+                section += f"""
+                    <p class="notice">…and {len(mismatches) - MAX_RECONCILE_ROWS:,} more.</p>
+"""
+
+        section += """
+                </div>
+            </div>
+"""
+        f.write(self._squeeze(section) if self.settings['compact_report'] else section)
+
+    def analyze_budget(self, monthly_totals):
+        """Budget-vs-actual variance per month and unusual months per category
+
+        Returns ({month: variance}, anomalies). The rolling statistics up to
+        the month before the newest (the one most likely still filling up)
+        are saved in data/cache/analysis.json, so the next run only analyses
+        the months after them. They are rebuilt when the anomaly settings or
+        categories change, or an already analysed month's totals differ.
+        """
+        months = sorted(monthly_totals)
+        kwargs = {
+            'window': self.settings['anomaly_window'],
+            'threshold': self.settings['anomaly_threshold'],
+            'min_months': self.settings['anomaly_min_months'],
+        }
+        key = dict(kwargs, version=BudgetAnalyzer.VERSION,
+                   **{section: list(self.config[section]) for section in BudgetAnalyzer.SECTIONS})
+
+        analyzer, anomalies = None, []
+        saved = self._load_analysis()
+        if (saved is not None and saved['key'] == key and months
+                and (saved['last_month'] or '') < months[-1]
+                and saved['digest'] == self._analysis_digest(monthly_totals, saved['last_month'])):
+            analyzer = BudgetAnalyzer.from_dict(self.config, saved['analyzer'], **kwargs)
+            anomalies = saved['anomalies']
+
+        resumed_at = analyzer.last_month if analyzer else False
+        _, found, analyzer = analyze(self.config, {month: monthly_totals[month] for month in months[:-1]},
+                                     analyzer, **kwargs)
+        anomalies += found
+        if analyzer.last_month != resumed_at:
+            self._save_analysis({
+                'key': key,
+                'last_month': analyzer.last_month,
+                'digest': self._analysis_digest(monthly_totals, analyzer.last_month),
+                'analyzer': analyzer.to_dict(),
+                'anomalies': anomalies,
+            })
+
+        # The newest month on top of the saved state
+        _, found, _ = analyze(self.config, {month: monthly_totals[month] for month in months[-1:]},
+                              analyzer, **kwargs)
+        anomalies += found
+
+        variance_by_month = {month: budget_variance(self.config, monthly_totals[month]) for month in months}
+        return variance_by_month, anomalies
+
+    @staticmethod
+    def _analysis_digest(monthly_totals, last_month):
+        """Hash of the analysed categories' totals for every month up to last_month"""
+        analysed = [[month, monthly_totals[month]['expenses'], monthly_totals[month]['savings_goals']]
+                    for month in sorted(monthly_totals) if last_month and month <= last_month]
+        return hashlib.sha256(json.dumps(analysed, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _load_analysis(self):
+        try:
+            with open(self.cache_dir / 'analysis.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_analysis(self, state):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_if_changed(self.cache_dir / 'analysis.json', json.dumps(state))
+
+    def _write_highlights(self, f, monthly_totals):
+        """Highlights section: over-budget categories and unusual months, newest first"""
+        variance_by_month, anomalies = self.analyze_budget(monthly_totals)
+
+        over_budget = [dict(item, month=month)
+                       for month in sorted(variance_by_month, reverse=True)
+                       for item in variance_by_month[month] if item['difference'] > 0.005]
+        anomalies.sort(key=lambda item: item['month'], reverse=True)
+
+        if over_budget or anomalies:
+            print(f"⭐ Highlights: {len(over_budget)} over budget, {len(anomalies)} unusual")
+
+        def month_name(month):
+            return datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+
+        section = """<!-- section:highlights -->
+            <div class="month-section">
+                <div class="month-header">
+                    ⭐ Highlights
+                </div>
+                <div class="month-content">
+"""
+        if not over_budget and not anomalies:
+            section += """
+                    <p class="notice">✅ Nothing stands out - no category went over budget or looked unusual.</p>
+"""
+
+        if over_budget:
+            section += """
+                    <div class="category-section">
+                        <h3>🚨 Over Budget</h3>
+                        <table class="data-table">
+                            <thead>
+                                <tr><th>Month</th><th>Category</th><th class="r">Budget</th><th class="r">Spent</th><th class="r">Over By</th></tr>
+                            </thead>
+                            <tbody>
+"""
+            for item in over_budget[:MAX_HIGHLIGHTS]:
+                section += (f"                                <tr><td>{month_name(item['month'])}</td>"
+                            f"<td>{html.escape(item['category'])}</td>"
+                            f"<td class=\"r\">${item['budget']:,.2f}</td>"
+                            f"<td class=\"r\">${item['actual']:,.2f}</td>"
+                            f"<td class=\"r\">${item['difference']:,.2f}</td></tr>\n")
+            section += """
+                            </tbody>
+                        </table>
+                    </div>
+"""
+
+        if anomalies:
+            section += """
+                    <div class="category-section">
+                        <h3>📊 Unusual Months</h3>
+                        <table class="data-table">
+                            <thead>
+                                <tr><th>Month</th><th>Category</th><th class="r">Amount</th><th class="r">Usual</th><th>Note</th></tr>
+                            </thead>
+                            <tbody>
+"""
+            for item in anomalies[:MAX_HIGHLIGHTS]:
+                note = "Much higher than usual" if item['zscore'] > 0 else "Much lower than usual"
+                section += (f"                                <tr><td>{month_name(item['month'])}</td>"
+                            f"<td>{html.escape(item['category'])}</td>"
+                            f"<td class=\"r\">${item['actual']:,.2f}</td>"
+                            f"<td class=\"r\">${item['average']:,.2f}</td>"
+                            f"<td>{note}</td></tr>\n")
+            section += """
+                            </tbody>
+                        </table>
+                    </div>
+"""
+
+        section += """
+                </div>
+            </div>
+<!-- /section:highlights -->
+"""
+        f.write(self._squeeze(section) if self.settings['compact_report'] else section)
+
+    def refresh_sections(self, monthly_totals, content_hash, sections):
+        """Rewrite only the given marked sections (and content hash) of the existing report
+
+        For runs where nothing but budgets or highlight settings changed:
+        sections is a subset of {'highlights', 'savings-chart'}; the rest of
+        the report is copied through as it is. Returns False if a section
+        can't be found in the report.
+        """
+        print("\n📄 Updating report sections: " + (', '.join(sorted(sections)) or "content hash only"))
+        writers = {
+            'highlights': lambda f: self._write_highlights(f, monthly_totals),
+            'savings-chart': lambda f: f.write(self._savings_chart(monthly_totals)),
+        }
+
+        found = set()
+        head = True
+        try:
+            with atomic_write(self.report_file, 'w', encoding='utf-8') as f:
+                with open(self.report_file, 'r', encoding='utf-8') as src:
+                    for line in src:
+                        if head:
+                            line = HASH_META_RE.sub(f'<meta name="budget-content-hash" content="{content_hash}">', line)
+                            line = GENERATED_RE.sub(
+                                f"<p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>", line)
+                            head = '<div class="content">' not in line
+                        elif found == set(sections):
+                            # Nothing left to replace: copy the rest (the bulk of the report) as it is
+                            f.write(line)
+                            shutil.copyfileobj(src, f)
+                            break
+
+                        marker = SECTION_MARKER_RE.fullmatch(line.strip()) if '<!-- section:' in line else None
+                        if marker is None or marker.group(1) not in sections:
+                            f.write(line)
+                            continue
+
+                        # Skip the old section, write the new one
+                        end = f"<!-- /section:{marker.group(1)} -->"
+                        for line in src:
+                            if line.strip() == end:
+                                break
+                        writers[marker.group(1)](f)
+                        found.add(marker.group(1))
+
+                if found != set(sections):
+                    raise LookupError(f"sections not in report: {', '.join(set(sections) - found)}")
+        except (OSError, LookupError):
+            return False
+
+        print(f"✅ Report saved: {self.report_file}")
+        if self.settings['gzip_report']:
+            gz_file = self._write_gzip_copy(self.report_file)
+            print(f"✅ Compressed copy saved: {gz_file}")
+        return True
+
+    def _write_search_index(self, f, mode):
+        """Embed the search index (or write it to a sidecar .js file) plus the search script"""
+        if mode == 'sidecar':
+            sidecar = self.report_file.with_suffix('.search.js')
+            # Streamed to a temp file, kept only if it differs, so sync tools
+            # don't upload an unchanged sidecar again
+            with atomic_write(sidecar, 'w', only_if_changed=True, encoding='utf-8') as js:
+                js.write("window.BUDGET_SEARCH=")
+                self._search.write_json(js)
+                js.write(";\n")
+            f.write(f'\n<script src="{sidecar.name}"></script>')
+        else:
+            f.write("\n<script>window.BUDGET_SEARCH=")
+            self._search.write_json(f)
+            f.write(";\n</script>")
+
+        f.write(SEARCH_SCRIPT)
+        print(f"🔍 Search index: {len(self._search):,} transactions")
+        self._search.close()
+
+    def _write_charts(self, f, monthly_totals):
+        """Trends section: balance, expenses per category and savings goal progress"""
+        budget = self.settings['chart_points']
+        months = sorted(monthly_totals.keys())
+
+        # Balance from every transaction when rows are kept (as compact arrays), else month-end balances
+        if self.monthly_data:
+            days, _, balances = self.history_arrays()
+            xs, ys = array('d'), array('d')
+            for day, balance in zip(days, balances):
+                if not math.isnan(balance):
+                    xs.append(day)
+                    ys.append(balance)
+            labels = (datetime.fromordinal(int(days[0])).strftime('%m/%d/%Y'),
+                      datetime.fromordinal(int(days[-1])).strftime('%m/%d/%Y'))
+        else:
+            xs = range(len(months))
+            ys = [monthly_totals[month]['end_balance'] for month in months]
+            labels = (months[0], months[-1])
+
+        charts = [
+            balance_chart(xs, ys, budget, labels),
+            category_chart("💳 Monthly Expenses by Category", months, monthly_totals,
+                           'expenses', self.config['expenses'], budget),
+            self._savings_chart(monthly_totals),
+        ]
+
+        f.write("""
+            <div class="month-section">
+                <div class="month-header">
+                    📈 Trends
+                </div>
+                <div class="month-content">
+""")
+        f.write(''.join(charts))
+        f.write("""                </div>
+            </div>
+""")
+
+    def _savings_chart(self, monthly_totals):
+        """Savings goal chart (goals drawn from the budgets), marked as a replaceable section"""
+        chart = category_chart("🎯 Savings Goal Progress (running total)", sorted(monthly_totals), monthly_totals,
+                               'savings_goals', self.config['savings_goals'], self.settings['chart_points'],
+                               cumulative=True, targets=self.config['savings_goals'])
+        return f"<!-- section:savings-chart -->\n{chart}<!-- /section:savings-chart -->\n"
+
+    def _report_styles(self):
+        """<style> block for the report head, or a link to the shared stylesheet in compact mode"""
+        if not self.settings['compact_report']:
+            return "    <style>\n" + REPORT_CSS + "    </style>\n"
+
+        # One stylesheet next to the report, shared by every report in that folder
+        css = self._squeeze(REPORT_CSS) + COMPACT_CSS
+        write_if_changed(self.report_file.parent / REPORT_CSS_NAME, css)
+
+        return f'    <link rel="stylesheet" href="{REPORT_CSS_NAME}">\n'
+
+    @staticmethod
+    def _squeeze(text):
+        """Drop indentation and blank lines from a block of HTML or CSS"""
+        return ''.join(line.strip() + '\n' for line in text.splitlines() if line.strip())
+
+    @staticmethod
+    def _write_gzip_copy(source_file):
+        """Write source_file + '.gz' next to it (streamed, fixed mtime for stable bytes)"""
+        gz_file = source_file.with_name(source_file.name + '.gz')
+        with open(source_file, 'rb') as src, atomic_write(gz_file, 'wb') as raw, \
+                gzip.GzipFile(filename=source_file.name, mode='wb', fileobj=raw, mtime=0) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        return gz_file
+
+    def _write_months(self, f, sorted_months, monthly_totals):
+        """Write every month section (or the no-data message) to the report file"""
+        compact = self.settings['compact_report']
+
+        if not sorted_months:
+            f.write("""
+            <div class="no-data">
+                <h2>No Data Found</h2>
+                <p>Drop your Excel budget file in <code>data/inputs/</code> folder<br>
+                and run the program again to generate your report.</p>
+            </div>
+""")
+        else:
+            # Archived months get one line each in a table at the end
+            archived = [m for m in sorted_months if m in self.archived and m not in self.monthly_data]
+            archived_set = set(archived)
+
+            for month in sorted_months:
+                if month in archived_set:
+                    continue
+                month_name = datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+                totals = monthly_totals[month]
+
+                month_html = f"""
+            <div class="month-section">
+                <div class="month-header">
+                    📅 {month_name}
+                </div>
+                <div class="month-content">
+                    <!-- Summary Cards -->
+                    <div class="summary-cards">
+                        <div class="summary-card">
+                            <div class="label">Total Expenses</div>
+                            <div class="value">${totals['total_expenses']:,.2f}</div>
+                        </div>
+                        <div class="summary-card">
+                            <div class="label">Total Savings</div>
+                            <div class="value">${totals['total_savings']:,.2f}</div>
+                        </div>
+                        <div class="summary-card">
+                            <div class="label">Deposits</div>
+                            <div class="value positive">${totals['total_deposits']:,.2f}</div>
+                        </div>
+                        <div class="summary-card">
+                            <div class="label">End Balance</div>
+                            <div class="value">${totals['end_balance']:,.2f}</div>
+                        </div>
+                    </div>
+
+                    <!-- Expenses -->
+                    <div class="category-section">
+                        <h3>💳 Monthly Expenses</h3>
+                        <div class="category-grid">
+"""
+
+                for category in self.config['expenses'].keys():
+                    amount = totals['expenses'].get(category, 0)
+                    if amount > 0:
+                        month_html += f"""
+                            <div class="category-item">
+                                <span class="name">{category}</span>
+                                <span class="value">${amount:,.2f}</span>
+                            </div>
+"""
+
+                month_html += """
+                        </div>
+                    </div>
+
+                    <!-- Savings Goals -->
+                    <div class="category-section">
+                        <h3>🎯 Savings Goals</h3>
+                        <div class="category-grid">
+"""
+
+                for category in self.config['savings_goals'].keys():
+                    amount = totals['savings_goals'].get(category, 0)
+                    if amount > 0:
+                        month_html += f"""
+                            <div class="category-item">
+                                <span class="name">{category}</span>
                                 <span class="value">${amount:,.2f}</span>
                             </div>
 """
@@ -673,7 +2341,59 @@ class BudgetManager:
                 month_html += """
                         </div>
                     </div>
+"""
+                f.write(self._squeeze(month_html) if compact else month_html)
+
+                # Summary-only months have no rows to list
+                if month in self.monthly_data:
+                    if compact:
+                        self._write_compact_transaction_log(f, month)
+                    else:
+                        self._write_transaction_log(f, month)
+
+                f.write("</div>\n</div>\n" if compact else """                </div>
+            </div>
+""")
+
+            if archived:
+                self._write_archive(f, archived, monthly_totals)
 
+    def _write_archive(self, f, months, monthly_totals):
+        """Archived months as one summary line each (newest first)"""
+        section = f"""
+            <div class="month-section">
+                <div class="month-header">
+                    📦 Archived Months
+                </div>
+                <div class="month-content">
+                    <p class="notice">{len(months):,} older months are kept as totals only
+                    (detail_months = {self.settings['detail_months']}).</p>
+                    <table class="data-table">
+                        <thead>
+                            <tr><th>Month</th><th class="r">Expenses</th><th class="r">Savings</th><th class="r">Deposits</th><th class="r">Start Balance</th><th class="r">End Balance</th></tr>
+                        </thead>
+                        <tbody>
+"""
+        for month in months:
+            totals = monthly_totals[month]
+            month_name = datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+            section += (f"                            <tr><td>{month_name}</td>"
+                        f"<td class=\"r\">${totals['total_expenses']:,.2f}</td>"
+                        f"<td class=\"r\">${totals['total_savings']:,.2f}</td>"
+                        f"<td class=\"r\">${totals['total_deposits']:,.2f}</td>"
+                        f"<td class=\"r\">${totals['start_balance']:,.2f}</td>"
+                        f"<td class=\"r\">${totals['end_balance']:,.2f}</td></tr>\n")
+        section += """
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+"""
+        f.write(self._squeeze(section) if self.settings['compact_report'] else section)
+
+    def _write_transaction_log(self, f, month):
+        """Stream one month's transaction table to the report file"""
+        f.write("""
                     <!-- Transaction Details -->
                     <div class="category-section">
                         <h3>📝 Transaction Log</h3>
@@ -687,58 +2407,68 @@ class BudgetManager:
                                     </tr>
                                 </thead>
                                 <tbody>
-"""
-
-                for row in sorted(rows, key=lambda x: x['date']):
-                    date_str = row['date'].strftime('%m/%d/%Y')
-                    desc = row['description']
-
-                    # Calculate total for this row
-                    total_amount = (
-                        sum(abs(v) for v in row['expenses'].values()) +
-                        sum(abs(v) for v in row['savings_goals'].values())
-                    )
-
-                    if total_amount > 0:
-                        month_html += f"""
+""")
+
+        for row in self.monthly_data.iter_rows(month):
+            date_str = row['date'].strftime('%m/%d/%Y')
+            desc = row['description']
+
+            # Calculate total for this row
+            total_amount = (
+                sum(abs(v) for v in row['expenses'].values()) +
+                sum(abs(v) for v in row['savings_goals'].values())
+            )
+
+            if total_amount > 0:
+                if self._search is not None:
+                    self._search.add(row, total_amount, month)
+                f.write(f"""
                                     <tr>
                                         <td style="padding: 8px; border-bottom: 1px solid #f0f0f0;">{date_str}</td>
                                         <td style="padding: 8px; border-bottom: 1px solid #f0f0f0;">{desc}</td>
                                         <td style="padding: 8px; border-bottom: 1px solid #f0f0f0; text-align: right;">${total_amount:,.2f}</td>
                                     </tr>
-"""
+""")
 
-                month_html += """
+        f.write("""
                                 </tbody>
                             </table>
                         </div>
                     </div>
-                </div>
-            </div>
-"""
-                html_content += month_html
+""")
+
+    def _write_compact_transaction_log(self, f, month):
+        """Transaction table with class-based cells (styles live in the shared stylesheet)"""
+        f.write('<div class="category-section">\n<h3>📝 Transaction Log</h3>\n'
+                '<div class="log"><table><thead><tr><th>Date</th><th>Description</th>'
+                '<th class="r">Amount</th></tr></thead><tbody>\n')
+
+        for row in self.monthly_data.iter_rows(month):
+            total_amount = (
+                sum(abs(v) for v in row['expenses'].values()) +
+                sum(abs(v) for v in row['savings_goals'].values())
+            )
+
+            if total_amount > 0:
+                if self._search is not None:
+                    self._search.add(row, total_amount, month)
+                f.write(f'<tr><td>{row["date"]:%m/%d/%Y}</td><td>{row["description"]}</td>'
+                        f'<td class="r">${total_amount:,.2f}</td></tr>\n')
+
+        f.write('</tbody></table></div>\n</div>\n')
+
+    def run(self, summary_only=None, export=None):
+        """Main execution
+
+        summary_only skips the transaction log and never stores rows
+        (defaults to the summary_only setting in config.json).
+        export also writes the .xlsx workbook (defaults to the export_excel setting).
+        """
+        if summary_only is None:
+            summary_only = self.settings['summary_only']
+        if export is None:
+            export = self.settings['export_excel']
 
-        html_end = """
-        </div>
-
-        <div class="footer">
-            Made with ❤️ for Mom
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-        # Write HTML file
-        full_html = html_start + html_content + html_end
-        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-
-        print(f"✅ Report saved: {REPORT_FILE}")
-        return REPORT_FILE
-
-    def run(self):
-        """Main execution"""
         print("=" * 70)
         print("🚀 MOM'S BUDGET MANAGER")
         print("=" * 70)
@@ -751,38 +2481,324 @@ class BudgetManager:
             print("   Drop your budget Excel (.xlsx) or CSV file there and run again!")
             return False
 
-        # Process each input file
-        for input_file in input_files:
-            try:
-                # Detect file type and use appropriate processor
-                if input_file.suffix.lower() == '.csv':
-                    self.process_csv_file(input_file)
-                else:  # .xlsx or .xls
-                    self.process_excel_file(input_file)
-            except Exception as e:
-                print(f"❌ Error processing {input_file.name}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+        # Nothing to do when the inputs and config are exactly as last time
+        content_hash = self.content_hash(input_files, summary_only)
+        if self.is_up_to_date(content_hash, export, summary_only):
+            print("\n✅ Report is up to date (inputs and config unchanged), nothing rewritten")
+            print(f"\n📊 Open your report: {self.report_file}")
+            return True
+
+        meta = self.cache_meta()
+        plan = self.plan_cache_update(meta, summary_only) if meta is not None else None
+        rendered = False
+        if plan is not None and plan['sections'] is not None and self.report_hash() == meta['content_hash']:
+            # Same rows and totals: only the budget-dependent sections change
+            print("\n⚡ Inputs and categories unchanged, reusing the report")
+            monthly_totals = self.cached_totals()
+            rendered = self.refresh_sections(monthly_totals, content_hash, plan['sections'])
+
+        if rendered:
+            # Rows and totals are unchanged; the rows are only needed again for the workbook
+            self.save_cache_meta(meta, content_hash)
+            if export:
+                self.load_cached_rows()
+        elif plan is not None:
+            print("\n⚡ Inputs unchanged, updating parsed rows and totals from the cache")
+            monthly_totals = self.update_cache(plan)
+        else:
+            monthly_totals = self.ingest(input_files, summary_only)
 
         # Generate report
-        if self.monthly_data:
-            self.generate_html_report()
+        if monthly_totals:
+            if not rendered:
+                self.save_cache(monthly_totals, content_hash, input_files, summary_only)
+                self.generate_html_report(monthly_totals, content_hash)
+            if export:
+                self.export_excel(monthly_totals, content_hash)
             print("\n" + "=" * 70)
             print("✅ COMPLETE!")
             print("=" * 70)
-            print(f"\n📊 Open your report: {REPORT_FILE}")
+            print(f"\n📊 Open your report: {self.report_file}")
             print(f"💰 Edit budget: budget_editor.html\n")
             return True
         else:
             print("\n❌ No data found in Excel files")
             return False
 
+    def ingest(self, input_files, summary_only=False):
+        """Read every input file and return {month: totals}
+
+        Rows are kept in self.monthly_data unless summary_only is set.
+        Older months are compacted when detail_months is set.
+        """
+        # Summary-only runs fold rows into running totals instead of storing them
+        if summary_only:
+            print("\n⚡ Summary-only mode: transaction log will be skipped")
+            running_totals = MonthlyTotals()
+            add_row = running_totals.add
+        else:
+            running_totals = None
+            add_row = self.monthly_data.append
+
+        # Months compacted by earlier runs are only kept as totals
+        compacting = self.settings['detail_months'] > 0
+        if compacting:
+            self.load_history()
+            reopened = MonthlyTotals()  # Rows read for archived months, in case an edit touched them
+        file_months = {}  # {input file: months it held}
+
+        # Process each input file
+        for input_file in input_files:
+            if compacting and self.is_archived_file(input_file):
+                print(f"\n📦 Skipping {input_file.name}: unchanged and every month is archived")
+                continue
+
+            add = add_row
+            if compacting:
+                months = file_months[input_file] = set()
+
+                def add(month_key, row_data, months=months):
+                    months.add(month_key)
+                    if month_key in self.archived:
+                        reopened.add(month_key, row_data)
+                    else:
+                        add_row(month_key, row_data)
+
+            try:
+                self.process_file(input_file, add)
+            except Exception as e:
+                print(f"❌ Error processing {input_file.name}: {e}")
+                import traceback
+                traceback.print_exc()
+                file_months.pop(input_file, None)
+                continue
+
+        monthly_totals = running_totals.months if summary_only else self.calculate_monthly_totals()
+
+        if compacting and self.archived:
+            self.reaggregate_archived(input_files, file_months, reopened)
+        if compacting and (monthly_totals or self.archived):
+            self.compact_history(monthly_totals, file_months)
+            monthly_totals = {**self.archived, **monthly_totals}
+
+        return monthly_totals
+
+
+def command_ingest(manager, args=None):
+    """Parse data/inputs/ into the cache without building a report"""
+    summary_only = getattr(args, 'summary_only', None)
+    if summary_only is None:
+        summary_only = manager.settings['summary_only']
+
+    input_files = manager.find_input_files()
+    if not input_files:
+        print("❌ No input files found in data/inputs/")
+        return False
+
+    monthly_totals = manager.ingest(input_files, summary_only)
+    if not monthly_totals:
+        print("\n❌ No data found in input files")
+        return False
+
+    manager.save_cache(monthly_totals, manager.content_hash(input_files, summary_only), input_files, summary_only)
+    print(f"\n✅ Cached {manager.monthly_data.row_count():,} rows across {len(monthly_totals)} months "
+          f"in {manager.cache_dir}")
+    return True
+
+
+def _require_cache(manager):
+    """Cache meta.json, warning on stderr when inputs or config changed since; None if missing"""
+    meta = manager.cache_meta()
+    if meta is None:
+        print("❌ No cache yet. Run: python finance.py ingest", file=sys.stderr)
+        return None
+    changes = manager.cache_changes(meta)
+    if changes:
+        print(f"⚠️  Cache is out of date ({', '.join(changes)}). Run: python finance.py ingest", file=sys.stderr)
+    return meta
+
+
+def command_report(manager, args):
+    """Build the report (and optional export) from the cache"""
+    meta = _require_cache(manager)
+    if meta is None:
+        return False
+
+    monthly_totals = manager.cached_totals()
+    manager.load_cached_rows()
+    if manager.settings['detail_months'] > 0:
+        manager.load_history()
+
+    manager.generate_html_report(monthly_totals, meta['content_hash'])
+    export = getattr(args, 'export', None)
+    if export or (export is None and manager.settings['export_excel']):
+        manager.export_excel(monthly_totals, meta['content_hash'])
+    return True
+
+
+def command_totals(manager, args):
+    """Month and category totals straight from the cache"""
+    if _require_cache(manager) is None:
+        return False
+
+    monthly_totals = manager.cached_totals()
+    # Exact match on the month (2025-01) or its year (2025), so 2025-1 matches nothing
+    months = sorted(m for m in monthly_totals if not args.month or args.month in (m, m[:4]))
+    if not months:
+        print(f"❌ No months match {args.month}", file=sys.stderr)
+        return False
+
+    if args.category:
+        section = next((s for s in ('expenses', 'savings_goals') if args.category in manager.config[s]), None)
+        if section is None:
+            print(f"❌ Unknown category: {args.category}", file=sys.stderr)
+            return False
+
+        values = {month: round(monthly_totals[month][section].get(args.category, 0), 2) for month in months}
+        result = {'category': args.category, 'section': section, 'months': values,
+                  'total': round(sum(values.values()), 2)}
+        if args.json:
+            print(json.dumps(result, indent=1))
+        else:
+            for month, value in values.items():
+                print(f"{month}  ${value:>12,.2f}")
+            print(f"{'Total':<7}  ${result['total']:>12,.2f}  ({args.category})")
+        return True
+
+    result = {}
+    for month in months:
+        totals = monthly_totals[month]
+        result[month] = {key: round(totals[key], 2) for key in
+                         ('total_expenses', 'total_savings', 'total_deposits', 'start_balance', 'end_balance')}
+        for section in ('expenses', 'savings_goals'):
+            result[month][section] = {cat: round(val, 2) for cat, val in totals[section].items() if val}
+
+    if args.json:
+        print(json.dumps(result, indent=1))
+    else:
+        for month, totals in result.items():
+            print(f"{month}  expenses ${totals['total_expenses']:>11,.2f}  savings ${totals['total_savings']:>10,.2f}  "
+                  f"deposits ${totals['total_deposits']:>11,.2f}  end balance ${totals['end_balance']:>12,.2f}")
+            if len(months) == 1:
+                for section in ('expenses', 'savings_goals'):
+                    for category, value in totals[section].items():
+                        print(f"    {category:<20} ${value:>11,.2f}")
+    return True
+
+
+def command_stats(manager, args):
+    """What the cache holds and whether it still matches the inputs"""
+    meta = manager.cache_meta()
+    if meta is None:
+        print("❌ No cache yet. Run: python finance.py ingest", file=sys.stderr)
+        return False
+
+    months = sorted(manager.cached_totals())
+    stats = {
+        'created': meta['created'],
+        'rows': meta['rows'],
+        'months': len(months),
+        'archived_months': meta['archived_months'],
+        'first_month': months[0] if months else None,
+        'last_month': months[-1] if months else None,
+        'summary_only': meta['summary_only'],
+        'files': sorted(meta['files']),
+        'changes': manager.cache_changes(meta),
+        'report_current': manager.report_hash() == meta['content_hash'],
+    }
+
+    if args.json:
+        print(json.dumps(stats, indent=1))
+    else:
+        print(f"Cache:    {manager.cache_dir} (built {stats['created']})")
+        print(f"Rows:     {stats['rows']:,}" + (" (summary only)" if stats['summary_only'] else ""))
+        print(f"Months:   {stats['months']} ({stats['first_month']} to {stats['last_month']}, "
+              f"{stats['archived_months']} archived)")
+        print(f"Files:    {', '.join(stats['files'])}")
+        print(f"Inputs:   {'; '.join(stats['changes']) if stats['changes'] else 'unchanged since ingest'}")
+        print(f"Report:   {'current' if stats['report_current'] else 'out of date'}")
+    return True
+
+
+def _cents(value):
+    """value with every float (nested in dicts too) rounded to cents"""
+    if isinstance(value, dict):
+        return {key: _cents(item) for key, item in value.items()}
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def command_verify(manager, args):
+    """Check the cache is current and its totals agree with its rows"""
+    meta = manager.cache_meta()
+    if meta is None:
+        print("❌ No cache yet. Run: python finance.py ingest")
+        return False
+
+    problems = manager.cache_changes(meta)
+
+    cached = manager.cached_totals()
+    manager.load_cached_rows()
+    if manager.monthly_data.row_count() != meta['rows']:
+        problems.append(f"rows.pickle has {manager.monthly_data.row_count():,} rows, expected {meta['rows']:,}")
+
+    # Round trip through JSON so both sides compare the same way, and to
+    # cents: sums taken in a different order differ in the last float bits
+    recomputed = json.loads(json.dumps(manager.calculate_monthly_totals()))
+    for month, totals in recomputed.items():
+        if _cents(cached.get(month)) != _cents(totals):
+            problems.append(f"{month} totals don't match its rows")
+    if len(cached) != len(recomputed) + meta['archived_months'] and not meta['summary_only']:
+        problems.append("totals.json has months without rows")
+
+    if not problems:
+        print(f"✅ Cache verified: {meta['rows']:,} rows, {len(cached)} months, inputs unchanged")
+        return True
+    for problem in problems:
+        print(f"❌ {problem}")
+    return False
+
+
+COMMANDS = {
+    'ingest': command_ingest,
+    'report': command_report,
+    'totals': command_totals,
+    'stats': command_stats,
+    'verify': command_verify,
+}
+
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Mom's Budget Manager")
+    parser.add_argument('--summary-only', action='store_true', default=None,
+                        help='Only build summary cards and category totals (no transaction log)')
+    parser.add_argument('--export', action='store_true', default=None,
+                        help='Also write financial_report.xlsx (transactions, monthly totals, per-year sheets)')
+
+    # Without a command: full ingest and report, as always
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    ingest = commands.add_parser('ingest', help='Parse data/inputs/ into the cache (no report)')
+    ingest.add_argument('--summary-only', action='store_true', default=argparse.SUPPRESS,
+                        help='Cache totals only, not the rows')
+    report = commands.add_parser('report', help='Build the report from the cache')
+    report.add_argument('--export', action='store_true', default=argparse.SUPPRESS,
+                        help='Also write financial_report.xlsx')
+    totals = commands.add_parser('totals', help='Print month/category totals from the cache')
+    totals.add_argument('--month', help='Month (2025-01) or year (2025); default all months')
+    totals.add_argument('--category', help='One expense or savings category')
+    totals.add_argument('--json', action='store_true', help='Print JSON')
+    stats = commands.add_parser('stats', help='Show what the cache holds')
+    stats.add_argument('--json', action='store_true', help='Print JSON')
+    commands.add_parser('verify', help='Check the cache against the inputs and itself')
+    args = parser.parse_args()
+
     manager = BudgetManager()
-    success = manager.run()
+    if args.command:
+        success = COMMANDS[args.command](manager, args)
+    else:
+        success = manager.run(summary_only=args.summary_only, export=args.export)
     sys.exit(0 if success else 1)
 
 
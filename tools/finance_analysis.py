@@ -0,0 +1,174 @@
+"""
+Mom's Budget Manager - Budget Analysis
+Budget-vs-actual variance and unusual-month detection
+
+Each category keeps a rolling mean and standard deviation over the last
+few months, updated Welford-style as months are added (and the oldest
+month dropped), so adding a month costs O(categories) rather than a pass
+over the whole history. A month is flagged when a category is far from
+its own recent average. The state can be saved with to_dict() and
+picked up again with from_dict().
+"""
+
+import math
+from collections import deque
+
+# Smallest spread a z-score is measured against: a flat history (a fixed
+# bill, or months of nothing) has no deviation, so any change would be
+# infinitely unusual. Differences under $1 or 1% of the average never count.
+MIN_SPREAD = 1.0
+MIN_SPREAD_FRACTION = 0.01
+
+
+class RollingStats:
+    """Mean and standard deviation of the last `window` values"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def stddev(self):
+        if len(self.values) < 2:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (len(self.values) - 1))
+
+    def add(self, value):
+        """Add the newest value, dropping the oldest once the window is full"""
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+
+        if n > self.window:
+            self._remove(self.values.popleft())
+
+    def _remove(self, value):
+        n = len(self.values)  # Count after removal
+        if n == 0:
+            self.mean = self.m2 = 0.0
+            return
+        old_mean = self.mean
+        self.mean = (old_mean * (n + 1) - value) / n
+        self.m2 -= (value - old_mean) * (value - self.mean)
+
+    def zscore(self, value):
+        """How many standard deviations value is from the current mean
+
+        The deviation is floored at MIN_SPREAD or MIN_SPREAD_FRACTION of the
+        mean, so a jump after flat months still stands out.
+        """
+        spread = max(self.stddev, MIN_SPREAD, MIN_SPREAD_FRACTION * abs(self.mean))
+        return (value - self.mean) / spread
+
+    def to_dict(self):
+        return {'values': list(self.values), 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, window, data):
+        stats = cls(window)
+        stats.values = deque(data['values'])
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        # A smaller window than before drops the oldest values
+        while len(stats.values) > window:
+            stats._remove(stats.values.popleft())
+        return stats
+
+
+def budget_variance(config, totals):
+    """[{'category', 'budget', 'actual', 'difference'}] for one month's expense
+    categories with a budget above zero"""
+    variance = []
+    for category, budget in config['expenses'].items():
+        if budget and budget > 0:
+            actual = totals['expenses'].get(category, 0)
+            variance.append({'category': category, 'budget': budget,
+                             'actual': actual, 'difference': actual - budget})
+    return variance
+
+
+class BudgetAnalyzer:
+    """Feed months in date order; each call returns that month's flagged items"""
+
+    SECTIONS = ('expenses', 'savings_goals')
+    VERSION = 2  # Bump when detection changes, so saved state is rebuilt
+
+    def __init__(self, config, window=12, threshold=2.5, min_months=6):
+        self.config = config
+        self.window = window
+        self.threshold = threshold
+        self.min_months = min_months
+        self.stats = {}         # {(section, category): RollingStats}
+        self.last_month = None  # Latest month added
+
+    def add_month(self, month, totals):
+        """Fold one month's totals in and return (variance, anomalies) for it
+
+        variance:  budget_variance() of the month
+        anomalies: [{'section', 'category', 'actual', 'average', 'zscore'}]
+        """
+        variance = budget_variance(self.config, totals)
+        anomalies = []
+
+        for section in self.SECTIONS:
+            for category in self.config[section]:
+                actual = totals[section].get(category, 0)
+                stats = self.stats.get((section, category))
+                if stats is None:
+                    stats = self.stats[(section, category)] = RollingStats(self.window)
+
+                # Compare against the months before this one
+                if len(stats) >= self.min_months:
+                    z = stats.zscore(actual)
+                    if abs(z) >= self.threshold:
+                        anomalies.append({'section': section, 'category': category, 'actual': actual,
+                                          'average': stats.mean, 'zscore': z})
+
+                stats.add(actual)
+
+        self.last_month = month
+        return variance, anomalies
+
+    def to_dict(self):
+        return {
+            'last_month': self.last_month,
+            'stats': {f"{section}/{category}": stats.to_dict()
+                      for (section, category), stats in self.stats.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, config, data, **kwargs):
+        analyzer = cls(config, **kwargs)
+        analyzer.last_month = data.get('last_month')
+        for key, stats in data.get('stats', {}).items():
+            section, category = key.split('/', 1)
+            analyzer.stats[(section, category)] = RollingStats.from_dict(analyzer.window, stats)
+        return analyzer
+
+
+def analyze(config, monthly_totals, analyzer=None, **kwargs):
+    """Run every month after analyzer.last_month through the analyzer
+
+    Returns ({month: variance}, [anomaly dicts with 'month'], analyzer).
+    Pass a saved analyzer to only process months that are new since then.
+    """
+    if analyzer is None:
+        analyzer = BudgetAnalyzer(config, **kwargs)
+
+    variance_by_month = {}
+    anomalies = []
+    for month in sorted(monthly_totals):
+        if analyzer.last_month is not None and month <= analyzer.last_month:
+            continue
+        variance, flagged = analyzer.add_month(month, monthly_totals[month])
+        variance_by_month[month] = variance
+        anomalies.extend(dict(item, month=month) for item in flagged)
+
+    return variance_by_month, anomalies, analyzer
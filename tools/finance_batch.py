@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Mom's Budget Manager - Batch Runner
+Generate reports for many ledgers at once, in parallel
+
+Usage:
+    python finance_batch.py manifest.json                 # One worker per CPU
+    python finance_batch.py manifest.json --workers 8     # Fixed number of workers
+    python finance_batch.py manifest.json --status batch_status.json
+
+Manifest format (JSON list, one entry per ledger):
+    [
+        "C:/Budgets/Smith",
+        {"name": "Jones", "dir": "C:/Budgets/Jones", "summary_only": true},
+        {"dir": "D:/Other", "config": "D:/shared/config.json", "inputs": "D:/Other/in"}
+    ]
+
+A ledger directory is laid out like the app folder (tools/config.json,
+data/inputs/, financial_report.html). "config", "inputs" and "report"
+override single paths; relative paths are resolved against the manifest.
+Each ledger runs in its own process and writes its console output to
+finance_batch.log inside its directory.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+LOG_NAME = "finance_batch.log"
+
+
+def load_manifest(manifest_file):
+    """Read the manifest and turn every entry into a ledger dict with absolute paths"""
+    manifest_file = Path(manifest_file)
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    if isinstance(entries, dict):
+        entries = entries.get('ledgers', [])
+
+    root = manifest_file.resolve().parent
+    ledgers = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'dir': entry}
+
+        ledger = dict(entry)
+        for key in ('dir', 'config', 'inputs', 'report'):
+            if ledger.get(key):
+                ledger[key] = str((root / ledger[key]).resolve())
+
+        ledger.setdefault('name', Path(ledger['dir']).name)
+        ledgers.append(ledger)
+
+    return ledgers
+
+
+def run_ledger(ledger):
+    """Process one ledger in isolation and return its status
+
+    Runs inside a worker process. Console output goes to the ledger's own
+    log file, and any failure (including sys.exit from a bad config) is
+    caught so it never affects the other ledgers.
+    """
+    import finance
+
+    start = time.perf_counter()
+    status = {'name': ledger['name'], 'dir': ledger['dir'], 'status': 'failed',
+              'report': None, 'error': None}
+
+    log_file = Path(ledger['dir']) / LOG_NAME
+    status['log'] = str(log_file)
+
+    try:
+        with open(log_file, 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            try:
+                manager = finance.BudgetManager(
+                    base_dir=ledger['dir'],
+                    config_file=ledger.get('config'),
+                    inputs_dir=ledger.get('inputs'),
+                    report_file=ledger.get('report')
+                )
+                if manager.run(summary_only=ledger.get('summary_only')):
+                    status['status'] = 'ok'
+                    status['report'] = str(manager.report_file)
+                else:
+                    status['status'] = 'no-data'
+            except SystemExit as e:
+                status['error'] = f"Exited with code {e.code} (see log)"
+            except Exception as e:
+                status['error'] = str(e)
+                traceback.print_exc()
+    except OSError as e:
+        status['error'] = f"Cannot write log: {e}"
+
+    status['seconds'] = round(time.perf_counter() - start, 3)
+    return status
+
+
+def run_batch(ledgers, workers=None):
+    """Run every ledger on a process pool, printing progress as they finish"""
+    results = []
+    total = len(ledgers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_ledger, ledger): ledger for ledger in ledgers}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            ledger = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # Worker process died
+                result = {'name': ledger['name'], 'dir': ledger['dir'], 'status': 'failed',
+                          'report': None, 'error': str(e), 'seconds': None}
+
+            icon = {'ok': '✅', 'no-data': '⚠️ '}.get(result['status'], '❌')
+            seconds = f"{result['seconds']:.2f}s" if result['seconds'] is not None else '-'
+            print(f"   [{done}/{total}] {icon} {result['name']} ({seconds})"
+                  + (f" - {result['error']}" if result['error'] else ""))
+            results.append(result)
+
+    return results
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Generate budget reports for many ledgers")
+    parser.add_argument('manifest', help='JSON list of ledger directories')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: one per CPU)')
+    parser.add_argument('--status', help='Write per-ledger status and timing to this JSON file')
+    args = parser.parse_args()
+
+    ledgers = load_manifest(args.manifest)
+
+    print("=" * 70)
+    print(f"🚀 BATCH RUN: {len(ledgers)} ledgers on {args.workers or os.cpu_count()} workers")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    results = run_batch(ledgers, args.workers)
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    if args.status:
+        with open(args.status, 'w', encoding='utf-8') as f:
+            json.dump({'seconds': round(elapsed, 3), 'counts': counts, 'ledgers': results}, f, indent=2)
+
+    print("\n" + "=" * 70)
+    print(f"✅ {counts.get('ok', 0)} ok, ⚠️  {counts.get('no-data', 0)} no data, "
+          f"❌ {counts.get('failed', 0)} failed in {elapsed:.1f}s")
+    print("=" * 70)
+
+    sys.exit(0 if not counts.get('failed') else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Mom's Budget Manager - Trend Charts
+Small inline SVG charts for the report, drawn on the server side
+
+Every series is reduced with Largest-Triangle-Three-Buckets (LTTB) to a
+fixed number of points before drawing, so a chart stays the same size
+however many transactions are behind it.
+"""
+
+import html
+
+WIDTH = 1000
+HEIGHT = 260
+PAD_LEFT = 90
+PAD_RIGHT = 20
+PAD_TOP = 20
+PAD_BOTTOM = 40
+
+COLORS = [
+    '#667eea', '#AB987A', '#4caf50', '#f44336', '#0F1626', '#ff9800',
+    '#9c27b0', '#00bcd4', '#795548', '#e91e63', '#607d8b', '#8bc34a',
+]
+
+
+def lttb(points, threshold):
+    """Downsample [(x, y), ...] to at most threshold points, keeping the shape"""
+    return lttb_xy([x for x, _ in points], [y for _, y in points], threshold)
+
+
+def lttb_xy(xs, ys, threshold):
+    """LTTB over separate x and y sequences (e.g. compact arrays), giving [(x, y), ...]
+
+    Always keeps the first and last point. Each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Only the kept points become tuples.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(zip(xs, ys))
+
+    sampled = [(xs[0], ys[0])]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # Index of the last kept point
+
+    for i in range(threshold - 2):
+        # Average of the next bucket
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # Point in this bucket with the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1
+        best = start
+        for j in range(start, end):
+            x, y = xs[j], ys[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled.append((xs[best], ys[best]))
+        a = best
+
+    sampled.append((xs[-1], ys[-1]))
+    return sampled
+
+
+def _money(value):
+    """Short axis label: $1.2k, $3.4M"""
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+    if value >= 1_000_000:
+        return f"{sign}${value / 1_000_000:.1f}M"
+    if value >= 1_000:
+        return f"{sign}${value / 1_000:.1f}k"
+    return f"{sign}${value:,.0f}"
+
+
+def line_chart(title, series, x_labels, guides=()):
+    """SVG line chart
+
+    series:   [(name, [(x, y), ...]), ...] - already downsampled
+    x_labels: (left label, right label) for the x axis
+    guides:   [(name, y, series index), ...] dashed horizontal lines drawn in
+              the matching series' colour, e.g. savings targets
+    """
+    all_points = [p for _, points in series for p in points]
+    if not all_points:
+        return ""
+
+    xs = [p[0] for p in all_points]
+    ys = [p[1] for p in all_points] + [y for _, y, _ in guides]
+    min_x, max_x = min(xs), max(xs)
+    min_y, max_y = min(ys + [0]), max(ys + [0])
+    span_x = (max_x - min_x) or 1
+    span_y = (max_y - min_y) or 1
+    plot_w = WIDTH - PAD_LEFT - PAD_RIGHT
+    plot_h = HEIGHT - PAD_TOP - PAD_BOTTOM
+
+    def sx(x):
+        return PAD_LEFT + (x - min_x) / span_x * plot_w
+
+    def sy(y):
+        return PAD_TOP + (max_y - y) / span_y * plot_h
+
+    parts = [
+        f'<svg class="chart" viewBox="0 0 {WIDTH} {HEIGHT}" width="100%" role="img" '
+        f'aria-label="{html.escape(title)}" xmlns="http://www.w3.org/2000/svg">',
+        f'<rect x="{PAD_LEFT}" y="{PAD_TOP}" width="{plot_w}" height="{plot_h}" fill="white" stroke="#e0e0e0"/>',
+    ]
+
+    # Y axis: top, middle, bottom (and zero when it is inside the range)
+    for value in sorted({max_y, (max_y + min_y) / 2, min_y}):
+        y = sy(value)
+        parts.append(f'<line x1="{PAD_LEFT}" y1="{y:.1f}" x2="{WIDTH - PAD_RIGHT}" y2="{y:.1f}" stroke="#f0f0f0"/>')
+        parts.append(f'<text x="{PAD_LEFT - 8}" y="{y + 4:.1f}" text-anchor="end" font-size="12" fill="#666">'
+                     f'{_money(value)}</text>')
+    if min_y < 0 < max_y:
+        parts.append(f'<line x1="{PAD_LEFT}" y1="{sy(0):.1f}" x2="{WIDTH - PAD_RIGHT}" y2="{sy(0):.1f}" stroke="#999"/>')
+
+    # X axis labels
+    left, right = x_labels
+    parts.append(f'<text x="{PAD_LEFT}" y="{HEIGHT - 15}" font-size="12" fill="#666">{html.escape(left)}</text>')
+    parts.append(f'<text x="{WIDTH - PAD_RIGHT}" y="{HEIGHT - 15}" text-anchor="end" font-size="12" fill="#666">'
+                 f'{html.escape(right)}</text>')
+
+    for name, y, index in guides:
+        color = COLORS[index % len(COLORS)]
+        parts.append(f'<line x1="{PAD_LEFT}" y1="{sy(y):.1f}" x2="{WIDTH - PAD_RIGHT}" y2="{sy(y):.1f}" '
+                     f'stroke="{color}" stroke-dasharray="6 4"><title>{html.escape(name)}: {_money(y)}</title></line>')
+
+    for i, (name, points) in enumerate(series):
+        color = COLORS[i % len(COLORS)]
+        coords = ' '.join(f'{sx(x):.1f},{sy(y):.1f}' for x, y in points)
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{coords}">'
+                     f'<title>{html.escape(name)}</title></polyline>')
+
+    parts.append('</svg>')
+
+    # Legend (only when there is more than one line)
+    legend = ""
+    if len(series) > 1 or guides:
+        items = [f'<span style="color: {COLORS[i % len(COLORS)]};">■</span> {html.escape(name)}'
+                 for i, (name, _) in enumerate(series)]
+        legend = f'<div class="chart-legend">{" &nbsp; ".join(items)}</div>'
+
+    return f'<div class="chart-box"><h3>{html.escape(title)}</h3>{"".join(parts)}{legend}</div>\n'
+
+
+def balance_chart(xs, ys, budget, x_labels):
+    """Balance over time from per-transaction x and balance sequences"""
+    return line_chart("💵 Balance Over Time", [("Balance", lttb_xy(xs, ys, budget))], x_labels)
+
+
+def category_chart(title, months, monthly_totals, section, categories, budget, cumulative=False, targets=None):
+    """One line per category across months (optionally as a running total)
+
+    targets: {category: goal amount}; goals above zero are drawn as dashed lines.
+    """
+    series = []
+    for category in categories:
+        points = []
+        running = 0
+        for i, month in enumerate(months):
+            value = monthly_totals[month][section].get(category, 0)
+            running = running + value if cumulative else value
+            points.append((i, running))
+        if any(y for _, y in points):
+            series.append((category, lttb(points, budget)))
+
+    targets = targets or {}
+    guides = [(f"{name} goal", targets[name], i) for i, (name, _) in enumerate(series)
+              if targets.get(name, 0) > 0]
+    return line_chart(title, series, (months[0], months[-1]) if months else ('', ''), guides)
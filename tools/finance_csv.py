@@ -0,0 +1,143 @@
+"""
+Mom's Budget Manager - CSV Reader
+Read bank and spreadsheet CSV exports whatever their encoding and delimiter
+
+The encoding (byte order mark, UTF-16, UTF-8, Windows-1252, Latin-1) and
+the dialect (delimiter, quoting) are worked out once from the first 64 KB.
+The file is then read through a large buffer and handed out in batches of
+rows, so the per-row work stays inside the csv module. Blank lines are
+dropped here; short or ragged rows are passed through as they are.
+"""
+
+import codecs
+import csv
+import io
+import re
+from itertools import islice
+
+SAMPLE_SIZE = 64 * 1024
+BUFFER_SIZE = 1024 * 1024
+BATCH_SIZE = 10000
+DELIMITERS = ',;\t|'
+
+# "12,50" or "1.234,50": an amount written with a decimal comma
+DECIMAL_COMMA_RE = re.compile(r'-?\d{1,3}(?:\.\d{3})*,\d{1,2}|-?\d+,\d{1,2}')
+
+
+def detect_encoding(sample):
+    """Best guess at the text encoding of the first bytes of a file"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return 'utf-32'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    # UTF-16 without a BOM: every other byte of plain text is zero
+    if sample[1::2].count(0) > len(sample) // 4:
+        return 'utf-16-le'
+    if sample[0::2].count(0) > len(sample) // 4:
+        return 'utf-16-be'
+
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'  # Decodes any byte
+
+
+def sniff_dialect(text):
+    """csv dialect for a sample of complete lines (comma-separated if unsure)"""
+    header = text.split('\n', 1)[0]
+    try:
+        sniffed = csv.Sniffer().sniff(text, delimiters=DELIMITERS)
+        if sniffed.delimiter in header or ',' not in header:
+            # Keep Excel's "" escaping, which the sniffer only reports if the sample has one
+            return type('sniffed', (csv.excel,), {'delimiter': sniffed.delimiter,
+                                                  'quotechar': sniffed.quotechar or '"',
+                                                  'skipinitialspace': sniffed.skipinitialspace})
+    except csv.Error:
+        pass
+
+    # Fall back to whichever delimiter splits the header into most columns
+    delimiter = max(DELIMITERS, key=header.count)
+    if not header.count(delimiter):
+        return csv.excel
+    return type('sniffed', (csv.excel,), {'delimiter': delimiter})
+
+
+def parse_amount(value):
+    """Number from a cell like "$1,234.56" or "(12.00)", or None"""
+    text = str(value).strip().replace('$', '').replace(',', '').replace(' ', '')
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1]
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+class CsvFile:
+    """One CSV file with its sniffed encoding, dialect and header row"""
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+
+        with open(path, 'rb') as f:
+            sample = f.read(SAMPLE_SIZE)
+        self.encoding = detect_encoding(sample)
+
+        text = codecs.getincrementaldecoder(self.encoding)(errors='replace').decode(sample, final=False)
+        if len(sample) == SAMPLE_SIZE and '\n' in text:
+            text = text[:text.rindex('\n') + 1]  # Complete lines only
+        self.dialect = sniff_dialect(text)
+
+        # European exports write 12,50 for 12.50 (only possible without comma delimiters)
+        self.decimal_comma = self.dialect.delimiter != ',' and any(
+            DECIMAL_COMMA_RE.fullmatch(cell.strip())
+            for row in islice(csv.reader(io.StringIO(text), self.dialect), 1, None)
+            for cell in row[2:]
+        )
+
+    def describe(self):
+        """Short description for the log, e.g. "cp1252, ';'-separated" """
+        text = f"{self.encoding}, {self.dialect.delimiter!r}-separated"
+        if self.decimal_comma:
+            text += ", decimal comma"
+        return text
+
+    def batches(self):
+        """Yield the header row, then lists of up to batch_size data rows"""
+        with open(self.path, 'r', encoding=self.encoding, errors='replace',
+                  newline='', buffering=BUFFER_SIZE) as f:
+            reader = csv.reader(f, self.dialect)
+
+            # Header is the first line with anything in it
+            header = next((row for row in reader if any(cell.strip() for cell in row)), [])
+            if header:
+                header[0] = header[0].lstrip('\ufeff')
+            yield header
+
+            while True:
+                batch = list(islice(reader, self.batch_size))
+                if not batch:
+                    return
+                rows = [row for row in batch if row]  # Blank lines come back as []
+                if self.decimal_comma:
+                    rows = [self._decimal_point(row) for row in rows]
+                yield rows
+
+    @staticmethod
+    def _decimal_point(row):
+        """Rewrite "1.234,50" amounts (from column C on) as "1234.50" """
+        return row[:2] + [cell.replace('.', '').replace(',', '.') if ',' in cell else cell
+                          for cell in row[2:]]
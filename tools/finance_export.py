@@ -0,0 +1,118 @@
+"""
+Mom's Budget Manager - Excel Export
+Write the merged ledger and monthly totals back out as one .xlsx workbook
+
+Uses openpyxl's write-only mode: rows are streamed from the month store
+straight into the sheets, so the workbook is never held in memory.
+Sheets:
+    Transactions    every row, oldest first
+    Monthly Totals  one row per month with every category
+    2024, 2025...   the same transactions split by year
+
+Excel stops at 1,048,576 rows per sheet and write-only mode does not
+check, so a sheet that fills up continues in "Transactions (2)",
+"2024 (2)" and so on, each with its own header row.
+
+The totals sheet is written from the same monthly totals as the HTML
+report, so the two can never disagree. Rows are not de-duplicated:
+two identical purchases on the same day are two real transactions.
+"""
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+SECTIONS = ('expenses', 'savings_goals', 'accounts')
+EXCEL_MAX_ROWS = 1048576
+
+
+def _header(ws, titles):
+    """Bold header row"""
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    ws.append(cells)
+
+
+class SheetSeries:
+    """A sheet that continues in "title (2)", "title (3)"... when it fills up"""
+
+    def __init__(self, wb, title, titles, max_rows=EXCEL_MAX_ROWS):
+        self.wb = wb
+        self.title = title
+        self.titles = titles
+        self.max_rows = max_rows
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title} ({self.sheets})"
+        self.ws = self.wb.create_sheet(title)
+        self.ws.column_dimensions['C'].width = 40
+        _header(self.ws, self.titles)
+        self.rows = 1  # Header
+
+    def append(self, values):
+        if self.rows >= self.max_rows:
+            self._new_sheet()
+        self.ws.append(values)
+        self.rows += 1
+
+
+def export_workbook(store, config, out, monthly_totals, max_rows=EXCEL_MAX_ROWS, content_hash=None):
+    """Stream the rows in store (a MonthStore) into out (a path or binary file)
+
+    monthly_totals: {month: totals} as shown in the report, archived months
+    included. Without stored rows (summary-only runs) only the totals sheet
+    is written. max_rows is the row limit per sheet, header included.
+    content_hash is stored as the workbook's identifier property, so a
+    later run can tell whether the file is current.
+    Returns the number of transactions written.
+    """
+    categories = [(section, category) for section in SECTIONS for category in config[section]]
+
+    wb = openpyxl.Workbook(write_only=True)
+    if content_hash:
+        wb.properties.identifier = content_hash
+    has_rows = bool(store)
+
+    transaction_titles = ['Date', 'Month', 'Description', 'Amount'] + [c for _, c in categories]
+    if has_rows:
+        transactions = SheetSeries(wb, 'Transactions', transaction_titles, max_rows)
+
+    totals_sheet = wb.create_sheet('Monthly Totals')
+    _header(totals_sheet, ['Month', 'Total Expenses', 'Total Savings', 'Deposits',
+                           'Start Balance', 'End Balance']
+            + [c for section, c in categories if section != 'accounts'])
+
+    written = 0
+    if has_rows:
+        year_sheets = {}
+
+        for month in sorted(store.months()):
+            year = month[:4]
+            if year not in year_sheets:
+                year_sheets[year] = SheetSeries(wb, year, transaction_titles, max_rows)
+
+            for row in store.iter_rows(month):
+                amount = (sum(abs(v) for v in row['expenses'].values()) +
+                          sum(abs(v) for v in row['savings_goals'].values()))
+                values = [row['date'], month, row['description'], amount]
+                values += [row[section].get(category) for section, category in categories]
+
+                transactions.append(values)
+                year_sheets[year].append(values)
+                written += 1
+
+    for month in sorted(monthly_totals):
+        totals = monthly_totals[month]
+        values = ([totals['total_expenses'], totals['total_savings'], totals['total_deposits'],
+                   totals['start_balance'], totals['end_balance']]
+                  + [totals[section].get(category, 0) for section, category in categories if section != 'accounts'])
+        totals_sheet.append([month] + [round(value, 2) for value in values])
+
+    wb.save(out)
+    return written
@@ -2,6 +2,10 @@
 """
 Mom's Budget Manager - GUI Application
 Simple interface with one-click budget report generation
+
+The Dashboard tab shows the totals saved by the last run (data/cache/)
+as soon as the window opens, then checks data/inputs/ and config.json
+on a background thread and refreshes only the months that changed.
 """
 
 import tkinter as tk
@@ -12,7 +16,10 @@ import sys
 import os
 from pathlib import Path
 import threading
+import queue
 import webbrowser
+import multiprocessing
+from datetime import datetime
 
 # Directories
 if getattr(sys, 'frozen', False):
@@ -25,14 +32,32 @@ REPORT_FILE = BASE_DIR / "financial_report.html"
 
 
 class ConsoleRedirector:
-    """Redirect stdout/stderr to GUI console"""
+    """Redirect stdout/stderr to GUI console
+
+    Worker threads write too, so text is queued here and only inserted by
+    the Tk main thread, which drains the queue every POLL_MS milliseconds.
+    """
+    POLL_MS = 100
+
     def __init__(self, text_widget):
         self.text_widget = text_widget
+        self.queue = queue.Queue()
+        self.text_widget.after(self.POLL_MS, self.drain)
 
     def write(self, text):
-        self.text_widget.insert(tk.END, text)
-        self.text_widget.see(tk.END)
-        self.text_widget.update_idletasks()
+        self.queue.put(text)
+
+    def drain(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if chunks:
+            self.text_widget.insert(tk.END, ''.join(chunks))
+            self.text_widget.see(tk.END)
+        self.text_widget.after(self.POLL_MS, self.drain)
 
     def flush(self):
         pass
@@ -54,9 +79,18 @@ class BudgetGUI:
 
         self.root.configure(bg=self.colors['dark_bg'])
 
+        # Dashboard data: {month: totals} and the config it is shown against
+        self.monthly_totals = {}
+        self.dashboard_config = None
+        self.month_keys = []  # Newest first, same order as the month picker
+        self.refreshing = False
+
         # Create UI
         self.create_widgets()
 
+        # Saved totals first (fast), then look for new data in the background
+        self.root.after(0, self.load_dashboard)
+
     def create_widgets(self):
         """Create all GUI widgets"""
 
@@ -139,19 +173,29 @@ class BudgetGUI:
         )
         clear_btn.pack(side=LEFT, padx=5)
 
+        # Dashboard and console share the lower half
+        self.notebook = ttk.Notebook(content)
+        self.notebook.pack(fill=BOTH, expand=YES, pady=(20, 0))
+
+        dashboard_tab = tk.Frame(self.notebook, bg=self.colors['dark_bg'])
+        self.console_tab = tk.Frame(self.notebook, bg=self.colors['dark_bg'])
+        self.notebook.add(dashboard_tab, text="📊 Dashboard")
+        self.notebook.add(self.console_tab, text="🖥️ Console")
+        self.create_dashboard(dashboard_tab)
+
         # Console output section
         console_label = tk.Label(
-            content,
+            self.console_tab,
             text="CONSOLE OUTPUT",
             font=("Helvetica", 11, "bold"),
             bg=self.colors['dark_bg'],
             fg=self.colors['leather'],
             anchor=W
         )
-        console_label.pack(fill=X, pady=(20, 5))
+        console_label.pack(fill=X, pady=(10, 5))
 
         # Console frame with scrollbar
-        console_frame = tk.Frame(content, bg=self.colors['dark_bg'])
+        console_frame = tk.Frame(self.console_tab, bg=self.colors['dark_bg'])
         console_frame.pack(fill=BOTH, expand=YES, pady=10)
 
         scrollbar = ttk.Scrollbar(console_frame)
@@ -171,8 +215,7 @@ class BudgetGUI:
         scrollbar.config(command=self.console.yview)
 
         # Redirect stdout to console
-        sys.stdout = ConsoleRedirector(self.console)
-        sys.stderr = ConsoleRedirector(self.console)
+        sys.stdout = sys.stderr = ConsoleRedirector(self.console)
 
         # Status bar
         self.status_bar = tk.Label(
@@ -190,6 +233,212 @@ class BudgetGUI:
         # Print welcome message
         self.print_welcome()
 
+    def create_dashboard(self, parent):
+        """Month picker, summary cards and category tables"""
+        top = tk.Frame(parent, bg=self.colors['dark_bg'])
+        top.pack(fill=X, pady=(10, 10))
+
+        tk.Label(
+            top,
+            text="Month:",
+            font=("Helvetica", 11, "bold"),
+            bg=self.colors['dark_bg'],
+            fg=self.colors['leather']
+        ).pack(side=LEFT)
+
+        self.month_picker = ttk.Combobox(top, state='readonly', width=20)
+        self.month_picker.pack(side=LEFT, padx=10)
+        self.month_picker.bind('<<ComboboxSelected>>', self.show_month)
+
+        self.dashboard_status = tk.Label(
+            top,
+            text="Loading saved totals...",
+            font=("Helvetica", 9),
+            bg=self.colors['dark_bg'],
+            fg=self.colors['leather'],
+            anchor=E
+        )
+        self.dashboard_status.pack(side=RIGHT)
+
+        # Summary cards, as in the report
+        cards = tk.Frame(parent, bg=self.colors['dark_bg'])
+        cards.pack(fill=X, pady=5)
+
+        self.cards = {}
+        for key, label in (('total_expenses', "Total Expenses"), ('total_savings', "Total Savings"),
+                           ('total_deposits', "Deposits"), ('end_balance', "End Balance")):
+            card = tk.Frame(cards, bg=self.colors['navy'], padx=15, pady=10)
+            card.pack(side=LEFT, fill=X, expand=YES, padx=5)
+            tk.Label(card, text=label, font=("Helvetica", 10), bg=self.colors['navy'],
+                     fg=self.colors['leather']).pack()
+            value = tk.Label(card, text="—", font=("Helvetica", 18, "bold"), bg=self.colors['navy'], fg='white')
+            value.pack()
+            self.cards[key] = value
+
+        # Category tables side by side
+        tables = tk.Frame(parent, bg=self.colors['dark_bg'])
+        tables.pack(fill=BOTH, expand=YES, pady=10)
+
+        self.expense_table = self.create_table(tables, "💳 Monthly Expenses", ("Category", "Actual", "Budget", "Difference"))
+        self.savings_table = self.create_table(tables, "🎯 Savings Goals", ("Category", "Amount", "Goal"))
+
+    def create_table(self, parent, title, columns):
+        """Labelled read-only table; returns the Treeview"""
+        frame = tk.Frame(parent, bg=self.colors['dark_bg'])
+        frame.pack(side=LEFT, fill=BOTH, expand=YES, padx=5)
+
+        tk.Label(
+            frame,
+            text=title,
+            font=("Helvetica", 11, "bold"),
+            bg=self.colors['dark_bg'],
+            fg=self.colors['leather'],
+            anchor=W
+        ).pack(fill=X, pady=(0, 5))
+
+        table = ttk.Treeview(frame, columns=columns, show='headings', height=12)
+        for i, column in enumerate(columns):
+            table.heading(column, text=column)
+            table.column(column, width=150 if i == 0 else 90, anchor=W if i == 0 else E)
+        table.tag_configure('over', foreground='#f44336')
+        table.pack(fill=BOTH, expand=YES)
+        return table
+
+    def load_dashboard(self):
+        """Show the saved totals right away, then refresh in the background"""
+        try:
+            import finance
+            manager = finance.BudgetManager()
+            meta = manager.cache_meta()
+            if meta is not None:
+                self.apply_totals(manager.cached_totals(), manager.config, meta)
+            else:
+                self.dashboard_status.config(text="No saved totals yet")
+        except (Exception, SystemExit) as e:
+            # A broken config.json exits in finance; the console shows why
+            self.dashboard_status.config(text=f"Could not load saved totals ({e})")
+            return
+
+        self.refresh_dashboard()
+
+    def refresh_dashboard(self):
+        """Re-read changed inputs/config on a worker thread, then update the dashboard"""
+        if self.refreshing:
+            return
+        self.refreshing = True
+        self.run_btn.config(state='disabled')
+
+        def refresh():
+            try:
+                import finance
+                manager = finance.BudgetManager()
+                meta = manager.cache_meta()
+                plan = manager.plan_cache_update(meta, meta['summary_only']) if meta is not None else None
+                if plan is not None and not plan['keys'] and not plan['columns']:
+                    # Same inputs; config.json edits (budgets...) leave the totals as they are
+                    self.root.after(0, self.apply_totals, manager.cached_totals(), manager.config, meta)
+                    return
+
+                input_files = manager.find_input_files()
+                if not input_files:
+                    return
+
+                if plan is not None:
+                    # Renamed, moved or re-mapped categories: patch the cache in place
+                    self.root.after(0, self.dashboard_status.config, {'text': "Updating categories..."})
+                    monthly_totals = manager.update_cache(plan)
+                    manager.save_cache(monthly_totals, manager.content_hash(input_files, meta['summary_only']),
+                                       input_files, meta['summary_only'])
+                    self.root.after(0, self.apply_totals, monthly_totals, manager.config, manager.cache_meta())
+                    return
+
+                self.root.after(0, self.dashboard_status.config, {'text': "Reading new data..."})
+
+                # Unchanged files come from their raw column cache, so this is quick
+                if finance.command_ingest(manager):
+                    self.root.after(0, self.apply_totals, manager.cached_totals(), manager.config,
+                                    manager.cache_meta())
+
+            except (Exception, SystemExit) as e:
+                print(f"\n❌ Dashboard refresh failed: {e}")
+                self.root.after(0, self.dashboard_status.config, {'text': "Refresh failed - see Console"})
+
+            finally:
+                self.root.after(0, self.refresh_done)
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        thread.start()
+
+    def refresh_done(self):
+        self.refreshing = False
+        self.run_btn.config(state='normal')
+
+    @staticmethod
+    def status_text(meta, changed=0):
+        text = f"{meta['months']} months · saved {meta['created'].replace('T', ' ')}"
+        if changed:
+            text += f" · {changed} updated"
+        return text
+
+    def apply_totals(self, monthly_totals, config, meta):
+        """Swap in new totals, redrawing only if the shown month (or its budgets) changed"""
+        changed = {month for month in monthly_totals.keys() | self.monthly_totals.keys()
+                   if monthly_totals.get(month) != self.monthly_totals.get(month)}
+        config_changed = config != self.dashboard_config
+        had_data = bool(self.monthly_totals)
+
+        self.monthly_totals = monthly_totals
+        self.dashboard_config = config
+
+        months = sorted(monthly_totals, reverse=True)
+        selected = self.selected_month()
+        if months != self.month_keys:
+            self.month_keys = months
+            self.month_picker.config(values=[self.month_name(m) for m in months])
+            if selected not in monthly_totals:
+                selected = months[0] if months else None
+            if selected is not None:
+                self.month_picker.current(months.index(selected))
+
+        if selected is not None and (selected in changed or config_changed):
+            self.show_month()
+
+        self.dashboard_status.config(text=self.status_text(meta, len(changed) if had_data else 0))
+
+    def selected_month(self):
+        index = self.month_picker.current()
+        return self.month_keys[index] if 0 <= index < len(self.month_keys) else None
+
+    @staticmethod
+    def month_name(month):
+        return datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+
+    def show_month(self, event=None):
+        """Fill the cards and tables for the picked month"""
+        month = self.selected_month()
+        if month is None:
+            return
+        totals = self.monthly_totals[month]
+        config = self.dashboard_config
+
+        for key, label in self.cards.items():
+            label.config(text=f"${totals[key]:,.2f}")
+
+        self.expense_table.delete(*self.expense_table.get_children())
+        for category, budget in config['expenses'].items():
+            budget = budget or 0
+            actual = totals['expenses'].get(category, 0)
+            difference = actual - budget
+            tags = ('over',) if budget and difference > 0.005 else ()
+            self.expense_table.insert('', END, values=(category, f"${actual:,.2f}", f"${budget:,.2f}",
+                                                       f"${difference:,.2f}"), tags=tags)
+
+        self.savings_table.delete(*self.savings_table.get_children())
+        for category, goal in config['savings_goals'].items():
+            amount = totals['savings_goals'].get(category, 0)
+            self.savings_table.insert('', END, values=(category, f"${amount:,.2f}",
+                                                       f"${goal:,.2f}" if goal else "—"))
+
     def print_welcome(self):
         """Print welcome message"""
         print("=" * 70)
@@ -216,6 +465,7 @@ class BudgetGUI:
             try:
                 self.update_status("Processing...")
                 self.run_btn.config(state='disabled')
+                self.root.after(0, self.notebook.select, self.console_tab)
 
                 # Import and run finance module
                 import finance
@@ -224,6 +474,9 @@ class BudgetGUI:
                 success = manager.run()
 
                 if success:
+                    # The run saved fresh totals; show them
+                    self.root.after(0, self.apply_totals, manager.cached_totals(), manager.config,
+                                    manager.cache_meta())
                     self.update_status("Complete! Click 'Open Report' to view")
                     messagebox.showinfo(
                         "Success!",
@@ -289,6 +542,9 @@ class BudgetGUI:
 
 def main():
     """Main entry point"""
+    # Multi-sheet workbooks are parsed in worker processes, which need this in the .exe
+    multiprocessing.freeze_support()
+
     root = ttkb.Window(
         title="Mom's Budget Manager",
         themename="darkly",
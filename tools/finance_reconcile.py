@@ -0,0 +1,102 @@
+"""
+Mom's Budget Manager - Balance Reconciliation
+Check the recorded Balance column against the running balance
+
+The config notes say: Balance = Previous Balance - Expenses - Savings + Deposits.
+The expected balance for the whole history is one cumulative sum of each
+row's signed change, anchored on the first recorded balance. A row is
+flagged when its recorded balance jumps away from that running sum, i.e.
+where a new difference starts - later rows that agree with the flagged
+one are not flagged again.
+
+numpy is listed in requirements.txt, so a normal install (and the packaged
+app) runs the check vectorized. Without numpy it falls back to
+itertools.accumulate and a plain Python loop over the rows: still a single
+linear pass, but not vectorized, and much slower on millions of rows.
+"""
+
+import math
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+    NUMPY_SUPPORT = True
+except ImportError:
+    NUMPY_SUPPORT = False
+
+
+def row_change(row):
+    """Signed effect of one row on the balance: deposits in, expenses and savings out"""
+    return (
+        abs(row['accounts'].get('Deposits', 0))
+        - sum(abs(v) for v in row['expenses'].values())
+        - sum(abs(v) for v in row['savings_goals'].values())
+    )
+
+
+def reconcile(changes, balances, tolerance=0.01):
+    """Compare recorded balances to the running balance
+
+    changes:  signed change per row, in date order
+    balances: recorded balance per row (NaN where the row has none)
+
+    Returns {'checked': number of recorded balances,
+             'mismatches': [(row index, expected, recorded, difference)],
+             'drift': recorded minus expected on the last recorded row}
+    """
+    if NUMPY_SUPPORT:
+        return _reconcile_numpy(changes, balances, tolerance)
+    return _reconcile_python(changes, balances, tolerance)
+
+
+def _reconcile_numpy(changes, balances, tolerance):
+    changes = np.asarray(changes, dtype=np.float64)
+    balances = np.asarray(balances, dtype=np.float64)
+
+    running = np.cumsum(changes)
+    recorded = np.flatnonzero(~np.isnan(balances))
+    if recorded.size == 0:
+        return {'checked': 0, 'mismatches': [], 'drift': 0.0}
+
+    # Recorded minus running sum; constant while the ledger adds up
+    residual = balances[recorded] - running[recorded]
+    jumps = np.diff(residual)
+    flagged = np.flatnonzero(np.abs(jumps) > tolerance)
+
+    rows = recorded[flagged + 1]
+    previous = recorded[flagged]
+    expected = balances[previous] + (running[rows] - running[previous])
+
+    mismatches = [
+        (int(i), float(e), float(r), float(d))
+        for i, e, r, d in zip(rows, expected, balances[rows], jumps[flagged])
+    ]
+    return {'checked': int(recorded.size), 'mismatches': mismatches,
+            'drift': float(residual[-1] - residual[0])}
+
+
+def _reconcile_python(changes, balances, tolerance):
+    running = array('d', accumulate(changes))
+
+    mismatches = []
+    checked = 0
+    first_residual = previous = previous_residual = None
+
+    for i, balance in enumerate(balances):
+        if math.isnan(balance):
+            continue
+        checked += 1
+        residual = balance - running[i]
+
+        if previous is None:
+            first_residual = residual
+        elif abs(residual - previous_residual) > tolerance:
+            expected = balances[previous] + (running[i] - running[previous])
+            mismatches.append((i, expected, balance, residual - previous_residual))
+
+        previous, previous_residual = i, residual
+
+    if previous is None:
+        return {'checked': 0, 'mismatches': [], 'drift': 0.0}
+    return {'checked': checked, 'mismatches': mismatches, 'drift': previous_residual - first_residual}
@@ -0,0 +1,213 @@
+"""
+Mom's Budget Manager - Report Search
+Prebuilt inverted index so the report can be searched without scanning the page
+
+While the transaction log is written, every row is added here under an
+ID (its position in the log). The finished index maps each token of the
+description, category names and amount to the IDs containing it, with
+posting lists stored as base-36 gaps ("3,1,a" = IDs 3, 4, 14). The page's
+search box looks query words up in the sorted token list (prefix matches
+included) and intersects their posting lists.
+
+Transactions are streamed to a temporary file as they are added and the
+posting lists are kept as compact integer arrays, so building the index
+costs a few bytes per row in memory and the JSON is written straight to
+its destination.
+"""
+
+import json
+import re
+import shutil
+import tempfile
+from array import array
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:\.[0-9]+)?')
+
+# Most prefix expansions per query word, keeps short prefixes fast
+MAX_PREFIX_TERMS = 200
+
+
+def tokenize(text):
+    """Lower-case words and numbers ("Dr. Smith $12.50" -> dr, smith, 12.50)"""
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def _to_base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    if number == 0:
+        return '0'
+    out = []
+    while number:
+        number, rem = divmod(number, 36)
+        out.append(digits[rem])
+    return ''.join(reversed(out))
+
+
+def _json(value):
+    """Compact JSON, safe to embed inside a <script> tag"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+
+
+class SearchIndexBuilder:
+    """Collect transactions and build the compact token -> IDs index
+
+    spill_dir: where the temporary file of transactions goes (default:
+    the system temp folder).
+    """
+
+    def __init__(self, spill_dir=None):
+        # [date, description, amount, month] by ID, as comma-separated JSON
+        self._docs = tempfile.TemporaryFile('w+', encoding='utf-8', dir=spill_dir)
+        self._count = 0
+        self.postings = defaultdict(lambda: array('I'))  # {token: IDs, ascending}
+
+    def __len__(self):
+        return self._count
+
+    def add(self, row, amount, month):
+        """Index one transaction row as shown in the report"""
+        doc_id = self._count
+        self._count += 1
+        doc = [row['date'].strftime('%m/%d/%Y'), row['description'], round(amount, 2), month]
+        self._docs.write((',' if doc_id else '') + _json(doc))
+
+        tokens = set(tokenize(row['description']))
+        for section in ('expenses', 'savings_goals'):
+            for category in row[section]:
+                tokens.update(tokenize(category))
+        tokens.add(f"{amount:.2f}")
+        tokens.add(str(int(amount)))
+        tokens.add(month[:4])  # Year
+
+        for token in tokens:
+            self.postings[token].append(doc_id)
+
+    def write_json(self, f):
+        """Write the index as JSON (safe inside a <script> tag) to the text file f"""
+        f.write('{"v":1,"docs":[')
+        self._docs.seek(0)
+        shutil.copyfileobj(self._docs, f)
+
+        terms = sorted(self.postings)
+        f.write('],"terms":' + _json(terms) + ',"postings":[')
+        for i, term in enumerate(terms):
+            previous = 0
+            gaps = []
+            for doc_id in self.postings[term]:
+                gaps.append(_to_base36(doc_id - previous))
+                previous = doc_id
+            f.write(('"' if i == 0 else ',"') + ','.join(gaps) + '"')
+        f.write(']}')
+
+    def close(self):
+        """Remove the temporary file of transactions"""
+        self._docs.close()
+
+
+SEARCH_BOX_HTML = """
+            <div class="search-box">
+                <input type="search" id="search-input" placeholder="🔍 Search transactions (words, categories, amounts, years)..." autocomplete="off">
+                <div id="search-status"></div>
+                <table class="data-table" id="search-results" hidden>
+                    <thead>
+                        <tr><th>Date</th><th>Description</th><th class="r">Amount</th><th>Month</th></tr>
+                    </thead>
+                    <tbody></tbody>
+                </table>
+            </div>
+"""
+
+# Reads window.BUDGET_SEARCH (embedded, or from the sidecar .js file)
+SEARCH_SCRIPT = r"""
+<script>
+(function () {
+    var MAX_RESULTS = 200, MAX_PREFIX_TERMS = %(max_prefix)d;
+    var input = document.getElementById('search-input');
+    var status = document.getElementById('search-status');
+    var table = document.getElementById('search-results');
+    var index = window.BUDGET_SEARCH, cache = {};
+    if (!input || !index) { return; }
+
+    function decode(i) {
+        if (!(i in cache)) {
+            var ids = [], last = 0, gaps = index.postings[i].split(',');
+            for (var k = 0; k < gaps.length; k++) { last += parseInt(gaps[k], 36); ids.push(last); }
+            cache[i] = ids;
+        }
+        return cache[i];
+    }
+
+    function lowerBound(word) {
+        var lo = 0, hi = index.terms.length;
+        while (lo < hi) { var mid = (lo + hi) >> 1; if (index.terms[mid] < word) { lo = mid + 1; } else { hi = mid; } }
+        return lo;
+    }
+
+    function isPrefix(i, word) { return i < index.terms.length && index.terms[i].lastIndexOf(word, 0) === 0; }
+
+    // IDs for one query word: the exact token, or every token starting with it.
+    // Terms are sorted, so the exact token (if any) is always the first one
+    // kept; clipped lists the words whose expansion stopped at MAX_PREFIX_TERMS.
+    function lookup(word, clipped) {
+        var first = lowerBound(word), last = first;
+        while (last - first < MAX_PREFIX_TERMS && isPrefix(last, word)) { last++; }
+        if (isPrefix(last, word)) { clipped.push(word); }
+        if (last - first === 1) { return decode(first); }  // Already sorted
+
+        var seen = new Uint8Array(index.docs.length), ids = [];
+        for (var i = first; i < last; i++) {
+            var list = decode(i);
+            for (var k = 0; k < list.length; k++) { if (!seen[list[k]]) { seen[list[k]] = 1; ids.push(list[k]); } }
+        }
+        return ids.sort(function (a, b) { return a - b; });
+    }
+
+    function intersect(a, b) {
+        var out = [], i = 0, j = 0;
+        while (i < a.length && j < b.length) {
+            if (a[i] === b[j]) { out.push(a[i]); i++; j++; } else if (a[i] < b[j]) { i++; } else { j++; }
+        }
+        return out;
+    }
+
+    function escapeHtml(text) {
+        return String(text).replace(/[&<>"]/g, function (c) { return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]; });
+    }
+
+    function search() {
+        var words = input.value.toLowerCase().match(/[a-z0-9]+(?:\.[0-9]+)?/g);
+        if (!words) { status.textContent = ''; table.hidden = true; return; }
+
+        var start = performance.now(), ids = null, clipped = [];
+        for (var w = 0; w < words.length && (ids === null || ids.length); w++) {
+            var found = lookup(words[w], clipped);
+            ids = ids === null ? found : intersect(ids, found);
+        }
+
+        var rows = [], total = 0;
+        for (var k = 0; k < ids.length; k++) {
+            var d = index.docs[ids[k]];
+            total += d[2];
+            if (k < MAX_RESULTS) {
+                rows.push('<tr><td>' + d[0] + '</td><td>' + escapeHtml(d[1]) + '</td><td class="r">$' +
+                          d[2].toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2}) +
+                          '</td><td>' + d[3] + '</td></tr>');
+            }
+        }
+        table.tBodies[0].innerHTML = rows.join('');
+        table.hidden = !ids.length;
+        // A clipped prefix leaves matches out, so the count and total are only a lower bound
+        status.textContent = (clipped.length ? 'At least ' : '') + ids.length.toLocaleString() +
+            ' matches totalling ' + (clipped.length ? 'at least ' : '') + '$' +
+            total.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2}) +
+            (ids.length > MAX_RESULTS ? ' (showing first ' + MAX_RESULTS + ')' : '') +
+            ' - ' + (performance.now() - start).toFixed(1) + ' ms' +
+            (clipped.length ? ' - "' + clipped.join('", "') + '" matches more than ' + MAX_PREFIX_TERMS +
+                              ' words, so results are incomplete; type more to narrow it down' : '');
+    }
+
+    input.addEventListener('input', search);
+})();
+</script>
+""" % {'max_prefix': MAX_PREFIX_TERMS}
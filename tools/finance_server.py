@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Mom's Budget Manager - Local Report Server
+Serve the report, the budget editor and a small JSON API on this computer only
+
+Usage:
+    python finance_server.py                  # http://127.0.0.1:8765/
+    python finance_server.py --port 9000 --open
+    python finance_server.py --rebuild        # Regenerate the report before serving
+
+Pages:
+    /                        financial_report.html
+    /budget_editor.html      Budget editor
+    /budget_report.css       Shared stylesheet of compact reports
+    /financial_report.search.js   Search index, when written as a sidecar file
+
+JSON API (answered from an in-memory index, never re-rendered):
+    /api/months                               Every month with its summary numbers
+    /api/totals?month=2025-01[&category=Auto] Category totals for one month
+    /api/transactions?month=2025-01&page=1&size=50
+
+Every response carries an ETag (repeat visits get 304 Not Modified) and is
+sent pre-gzipped to browsers that accept it. HEAD is answered like GET,
+without the body.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import threading
+import webbrowser
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import finance
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+}
+
+
+def accepts_gzip(accept_encoding):
+    """True if an Accept-Encoding header allows gzip (q=0 refuses it)"""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    # An explicit gzip entry wins over the * wildcard
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+class ReportIndex:
+    """Months, category totals and transactions held in memory for the API"""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+        # Parse every input once
+        for input_file in manager.find_input_files():
+            try:
+                manager.process_file(input_file)
+            except Exception as e:
+                print(f"❌ Error processing {input_file.name}: {e}")
+
+        self.totals = manager.calculate_monthly_totals()
+        self.months = sorted(self.totals.keys(), reverse=True)
+
+        # Transactions per month, already in JSON-ready form and date order
+        self.transactions = {}
+        for month in self.months:
+            self.transactions[month] = [
+                self._transaction(row) for row in manager.monthly_data.iter_rows(month)
+            ]
+
+        print(f"✅ Indexed {sum(len(t) for t in self.transactions.values())} transactions "
+              f"across {len(self.months)} months")
+
+    def _transaction(self, row):
+        """JSON-ready copy of one row"""
+        return {
+            'date': row['date'].strftime('%Y-%m-%d'),
+            'description': row['description'],
+            'amount': round(
+                sum(abs(v) for v in row['expenses'].values()) +
+                sum(abs(v) for v in row['savings_goals'].values()), 2),
+            'expenses': row['expenses'],
+            'savings_goals': row['savings_goals'],
+            'accounts': row['accounts']
+        }
+
+    def month_summary(self, month):
+        """Summary card numbers for one month"""
+        totals = self.totals[month]
+        return {
+            'month': month,
+            'name': datetime.strptime(month, '%Y-%m').strftime('%B %Y'),
+            'total_expenses': round(totals['total_expenses'], 2),
+            'total_savings': round(totals['total_savings'], 2),
+            'total_deposits': round(totals['total_deposits'], 2),
+            'start_balance': totals['start_balance'],
+            'end_balance': totals['end_balance'],
+            'transactions': len(self.transactions.get(month, []))
+        }
+
+    def months_payload(self):
+        return {'months': [self.month_summary(month) for month in self.months]}
+
+    def totals_payload(self, month, category=None):
+        totals = self.totals[month]
+        payload = self.month_summary(month)
+        for section in ('expenses', 'savings_goals'):
+            payload[section] = {
+                cat: round(val, 2) for cat, val in totals[section].items()
+                if category is None or cat == category
+            }
+        return payload
+
+    def transactions_payload(self, month, page, size):
+        transactions = self.transactions.get(month, [])
+        start = (page - 1) * size
+        return {
+            'month': month,
+            'page': page,
+            'size': size,
+            'total': len(transactions),
+            'pages': (len(transactions) + size - 1) // size,
+            'transactions': transactions[start:start + size]
+        }
+
+
+class CachedResponse:
+    """Response body with its ETag and a gzipped copy, built once
+
+    The gzipped copy has its own ETag: it is a different representation,
+    so caches must not treat the two bodies as interchangeable.
+    """
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        digest = hashlib.sha1(body).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        # mtime=0 keeps the gzip bytes stable for the same body
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class ReportServer(ThreadingHTTPServer):
+    """HTTP server holding the index and response caches"""
+
+    daemon_threads = True
+
+    def __init__(self, address, index):
+        super().__init__(address, ReportRequestHandler)
+        self.index = index
+        self.files = {
+            '/': index.manager.report_file,
+            '/financial_report.html': index.manager.report_file,
+            '/budget_editor.html': index.manager.base_dir / "budget_editor.html",
+            '/' + finance.REPORT_CSS_NAME: index.manager.report_file.parent / finance.REPORT_CSS_NAME,
+            '/' + index.manager.report_file.with_suffix('.search.js').name:
+                index.manager.report_file.with_suffix('.search.js'),
+        }
+        self._file_cache = {}  # {path: (mtime_ns, size, CachedResponse)}
+        self._api_cache = {}   # {(endpoint, normalized arguments...): CachedResponse}
+        self._lock = threading.Lock()
+
+    def file_response(self, url_path):
+        """Cached response for a static page, reloaded only when the file changes"""
+        file_path = self.files.get(url_path)
+        if file_path is None or not file_path.exists():
+            return None
+
+        stat = file_path.stat()
+        with self._lock:
+            cached = self._file_cache.get(url_path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+
+        content_type = CONTENT_TYPES.get(file_path.suffix, 'application/octet-stream')
+        response = CachedResponse(file_path.read_bytes(), content_type)
+        with self._lock:
+            self._file_cache[url_path] = (stat.st_mtime_ns, stat.st_size, response)
+        return response
+
+    def api_response(self, key, build_payload):
+        """Cached JSON response; the index never changes while serving"""
+        with self._lock:
+            cached = self._api_cache.get(key)
+        if cached:
+            return cached
+
+        body = json.dumps(build_payload(), separators=(',', ':')).encode('utf-8')
+        response = CachedResponse(body, 'application/json')
+        with self._lock:
+            self._api_cache[key] = response
+        return response
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """Serve pages and API calls from the server's caches"""
+
+    server_version = "BudgetReportServer/1.0"
+    send_body = True  # False while answering HEAD
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        """Answer a GET or HEAD request; HEAD gets the same headers, no body"""
+        self.send_body = send_body
+        url = urlparse(self.path)
+
+        if url.path.startswith('/api/'):
+            try:
+                response = self._api(url)
+            except ValueError as e:
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+        else:
+            response = self.server.file_response(url.path)
+
+        if response is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Not found: {url.path}")
+            return
+
+        self._send(response)
+
+    def _api(self, url):
+        """Route an /api/ request to a cached JSON response (None for unknown paths)
+
+        Responses are cached on the validated arguments only, so extra or
+        repeated query parameters can't grow the cache.
+        """
+        index = self.server.index
+        query = parse_qs(url.query)
+
+        if url.path == '/api/months':
+            return self.server.api_response(('months',), index.months_payload)
+        if url.path not in ('/api/totals', '/api/transactions'):
+            return None
+
+        month = query.get('month', [None])[0]
+        if month not in index.totals:
+            raise ValueError(f"Unknown month: {month} (use YYYY-MM)")
+
+        if url.path == '/api/totals':
+            category = query.get('category', [None])[0]
+            if category is not None and not any(category in index.manager.config[section]
+                                                for section in ('expenses', 'savings_goals')):
+                raise ValueError(f"Unknown category: {category}")
+            return self.server.api_response(('totals', month, category),
+                                            lambda: index.totals_payload(month, category))
+
+        page = int(query.get('page', ['1'])[0])
+        size = min(int(query.get('size', [str(DEFAULT_PAGE_SIZE)])[0]), MAX_PAGE_SIZE)
+        if page < 1 or size < 1:
+            raise ValueError("page and size must be positive")
+        pages = max((len(index.transactions.get(month, [])) + size - 1) // size, 1)
+        if page > pages:
+            raise ValueError(f"page must be at most {pages}")
+        return self.server.api_response(('transactions', month, page, size),
+                                        lambda: index.transactions_payload(month, page, size))
+
+    def _send(self, response):
+        """Send a cached response, honouring If-None-Match and gzip"""
+        use_gzip = accepts_gzip(self.headers.get('Accept-Encoding', ''))
+        body = response.gzipped if use_gzip else response.body
+        etag = response.gzip_etag if use_gzip else response.etag
+
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', response.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if self.send_body:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.send_body:
+            self.wfile.write(body)
+
+
+def create_server(manager, port=DEFAULT_PORT, rebuild=False):
+    """Index the manager's inputs and return a ready-to-serve ReportServer"""
+    index = ReportIndex(manager)
+
+    if rebuild or not manager.report_file.exists():
+        manager.generate_html_report(index.totals)
+
+    return ReportServer(('127.0.0.1', port), index)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Serve the budget report locally")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the report before serving')
+    parser.add_argument('--open', action='store_true', help='Open the report in a browser')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🌐 MOM'S BUDGET REPORT SERVER")
+    print("=" * 70)
+
+    server = create_server(finance.BudgetManager(), args.port, args.rebuild)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    print(f"\n📊 Serving report at {url}  (Ctrl+C to stop)")
+
+    if args.open:
+        webbrowser.open(url)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    finally:
+        server.server_close()
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()